@@ -0,0 +1,215 @@
+"""
+Microbenchmark for move generation and the Card model.
+
+Collects a few hundred positions from greedy games and times, per call:
+- get_legal_moves on each position (plain moves and with stock macro-moves)
+- the baseline move generator (list-literal is_red, revealed flags and
+  _is_valid_sequence rescanning every run) on the same positions converted
+  to the baseline card and pile layout, next to today's generator
+- copy.deepcopy of a game, the copy a search makes of the board
+- the card checks the move rules use (colour, repr, copying) on the
+  flyweight Card next to a plain Card with a __dict__ and a list-literal
+  is_red, which is how cards used to be stored
+
+Usage:
+    python benchmarks/bench_moves.py [repeats]
+"""
+
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_structures.cards import Card
+from game_logic.solitaire_game import SolitaireGame, apply_move_to_game
+from game_logic.greedy_ai import get_greedy_move
+from game_logic.move_utils import get_legal_moves
+from config import KING, ACE
+
+class DictCard:
+    # the old card layout, for comparison
+    def __init__(self, rank: int, suit: str, revealed=False):
+        self.rank = rank
+        self.suit = suit
+        self.revealed = revealed
+
+    def is_red(self) -> bool:
+        return self.suit in ["H", "D"]
+
+    def __repr__(self):
+        suit_symbols = {"H": "♥", "D": "♦", "C": "♣", "S": "♠"}
+        rank_names = {1: "A", 11: "J", 12: "Q", 13: "K"}
+        rank_str = rank_names.get(self.rank, str(self.rank))
+        return f"{rank_str}{suit_symbols[self.suit]}"
+
+class OldMove:
+    # the baseline move: a type and a dict of details
+    def __init__(self, move_type: str, details: dict):
+        self.move_type = move_type
+        self.details = details
+
+class OldBoardPile:
+    # the baseline tableau pile, which found its top face-up card by scanning
+    def __init__(self, cards):
+        self.cards = cards
+
+    def can_add(self, card) -> bool:
+        if len(self.cards) == 0:
+            return card.rank == KING
+        top_card = self._get_top_revealed_card()
+        if top_card is None:
+            return False
+        if card.rank != top_card.rank - 1:
+            return False
+        return card.is_red() != top_card.is_red()
+
+    def _get_top_revealed_card(self):
+        for i in range(len(self.cards) - 1, -1, -1):
+            if self.cards[i].revealed:
+                return self.cards[i]
+        return None
+
+    def size(self) -> int:
+        return len(self.cards)
+
+class OldFoundationPile:
+    def __init__(self, suit: str, cards):
+        self.suit = suit
+        self.cards = cards
+
+    def can_add(self, card) -> bool:
+        if card.suit != self.suit:
+            return False
+        if len(self.cards) == 0:
+            return card.rank == ACE
+        return card.rank == self.cards[-1].rank + 1
+
+class OldStackPile:
+    # stock or waste as a plain list, top card last
+    def __init__(self, cards):
+        self.cards = cards
+
+    def peek(self):
+        return self.cards[-1] if self.cards else None
+
+    def size(self) -> int:
+        return len(self.cards)
+
+class OldGame:
+    def __init__(self, game):
+        # the same position in the baseline layout, face-up state on the cards
+        self.Board = [OldBoardPile([DictCard(c.rank, c.suit, pile.is_face_up(i)) for i, c in enumerate(pile.cards)])
+                      for pile in game.Board]
+        self.foundations = {suit: OldFoundationPile(suit, [DictCard(c.rank, c.suit, True) for c in pile.cards])
+                            for suit, pile in game.foundations.items()}
+        self.stock = OldStackPile([DictCard(c.rank, c.suit) for c in game.stock.cards])
+        self.waste = OldStackPile([DictCard(c.rank, c.suit, True) for c in game.waste.cards])
+
+def _is_valid_sequence(pile, start_idx):
+    """the baseline check: cards from start_idx to the top form a run"""
+    if start_idx < 0 or start_idx >= len(pile.cards):
+        return False
+    for i in range(start_idx, len(pile.cards)):
+        if not pile.cards[i].revealed:
+            return False
+    for i in range(start_idx, len(pile.cards) - 1):
+        a = pile.cards[i]
+        b = pile.cards[i + 1]
+        if a.rank != b.rank + 1:
+            return False
+        if a.is_red() == b.is_red():
+            return False
+    return True
+
+def baseline_legal_moves(game):
+    """the move generator as it was before the move and card rework"""
+    moves = []
+    if game.waste.size() > 0:
+        card = game.waste.peek()
+        if game.foundations[card.suit].can_add(card):
+            moves.append(OldMove("waste_to_foundation", {"card": card}))
+        for i, pile in enumerate(game.Board):
+            if pile.can_add(card):
+                moves.append(OldMove("waste_to_Board", {"column": i, "card": card}))
+    for i, pile in enumerate(game.Board):
+        if pile.size() == 0:
+            continue
+        for start_idx in range(len(pile.cards)):
+            if not pile.cards[start_idx].revealed:
+                continue
+            if not _is_valid_sequence(pile, start_idx):
+                continue
+            card = pile.cards[start_idx]
+            if start_idx == len(pile.cards) - 1 and game.foundations[card.suit].can_add(card):
+                moves.append(OldMove("Board_to_foundation", {"from": i, "card": card, "start_idx": start_idx}))
+            for j, dst in enumerate(game.Board):
+                if i == j:
+                    continue
+                if dst.can_add(card):
+                    moves.append(OldMove("Board_to_Board", {"from": i, "to": j, "card": card, "start_idx": start_idx}))
+    if game.stock.size() > 0:
+        moves.append(OldMove("draw_stock", {}))
+    elif game.waste.size() > 0:
+        moves.append(OldMove("reset_stock", {}))
+    return moves
+
+def same_moves(old_moves, new_moves) -> bool:
+    """whether both generators found the same moves (foundation targets aside)"""
+    def old_key(m):
+        d = m.details
+        return (m.move_type, d.get("from", -1), d.get("to", d.get("column", -1)), d.get("start_idx", -1))
+    def new_key(m):
+        dst = -1 if m.move_type.endswith("foundation") else m.dst
+        return (m.move_type, m.src, dst, m.start_idx)
+    return sorted(map(old_key, old_moves)) == sorted(map(new_key, new_moves))
+
+def positions(deals=range(10), moves=60):
+    # copies of every position along a few greedy games
+    games = []
+    for deal_number in deals:
+        game = SolitaireGame(deal_number=deal_number)
+        for _ in range(moves):
+            games.append(copy.deepcopy(game))
+            move = get_greedy_move(game)
+            if not move or not apply_move_to_game(game, move):
+                break
+    return games
+
+def per_call_us(fn, items, repeats):
+    """best time per call in microseconds over repeats passes"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        elapsed = (time.perf_counter() - start) / len(items) * 1e6
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    games = positions()
+    print(f"{len(games)} positions, best of {repeats}")
+    print(f"get_legal_moves:             {per_call_us(get_legal_moves, games, repeats):7.2f} us")
+    print(f"get_legal_moves (macros):    {per_call_us(lambda g: get_legal_moves(g, True), games, repeats):7.2f} us")
+    print(f"deepcopy(game):              {per_call_us(copy.deepcopy, games[:100], repeats):7.2f} us")
+    old_games = [OldGame(game) for game in games]
+    assert all(same_moves(baseline_legal_moves(o), get_legal_moves(g)) for o, g in zip(old_games, games))
+    before = per_call_us(baseline_legal_moves, old_games, repeats)
+    after = per_call_us(get_legal_moves, games, repeats)
+    print(f"move generation, baseline:   {before:7.2f} us")
+    print(f"move generation, now:        {after:7.2f} us  ({before / after:.1f}x)")
+
+    ranks_suits = [(rank, suit) for suit in "HDCS" for rank in range(1, 14)] * 20
+    for name, cls in (("dict card", DictCard), ("flyweight", Card)):
+        cards = [cls(rank, suit) for rank, suit in ranks_suits]
+        pairs = list(zip(cards, cards[1:]))
+        colour = per_call_us(lambda p: p[0].is_red() != p[1].is_red(), pairs, repeats)
+        text = per_call_us(repr, cards, repeats)
+        copying = per_call_us(copy.deepcopy, cards, repeats)
+        print(f"{name:10} colour check {colour:5.3f} us  repr {text:5.3f} us  deepcopy {copying:5.3f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Frame-time benchmark for the card renderer.
+
+Draws the full board of a mid-game position many times into an off-screen
+window (SDL dummy video driver) twice: once painting every card from
+scratch (rounded rects and two font renders per face-up card, the old
+draw_card) and once blitting the cached card sprites.
+
+Usage:
+    python benchmarks/bench_render.py [frames]
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import ui
+from game_logic.solitaire_game import SolitaireGame, apply_move_to_game
+from game_logic.greedy_ai import get_greedy_move
+
+def mid_game(deal_number=7, moves=40):
+    # play a few greedy moves so the waste and foundations are not empty
+    game = SolitaireGame(deal_number=deal_number)
+    for _ in range(moves):
+        move = get_greedy_move(game)
+        if not move or not apply_move_to_game(game, move):
+            break
+    # turn every board card face up: the worst case for the renderer
+    for pile in game.Board:
+        pile.set_cards(pile.cards)
+    return game
+
+def draw_frame(screen, game, layout, font, font_small):
+    screen.fill(ui.BACKGROUND_COLOR)
+    ui.draw_stock(screen, game.stock, layout["stock"], font_small, None)
+    ui.draw_waste(screen, game.waste, layout["waste"], font, font_small, None)
+    ui.draw_foundations(screen, game.foundations, layout["foundations"], font, font_small, None)
+    ui.draw_Board(screen, game.Board, layout["Board"], font, font_small, None)
+
+def time_frames(frames, screen, game, layout, font, font_small):
+    draw_frame(screen, game, layout, font, font_small)  # warm-up (fills the cache)
+    start = time.perf_counter()
+    for _ in range(frames):
+        draw_frame(screen, game, layout, font, font_small)
+    return (time.perf_counter() - start) * 1000 / frames
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    pygame.init()
+    screen = pygame.display.set_mode((ui.WINDOW_W, ui.WINDOW_H))
+    font = pygame.font.SysFont("arial", 24)
+    font_small = pygame.font.SysFont("arial", 18)
+    layout = ui.build_layout(ui.WINDOW_W, ui.WINDOW_H)
+    game = mid_game()
+    cards = sum(pile.size() for pile in game.Board)
+
+    cached_draw_card = ui.draw_card
+    ui.draw_card = ui._paint_card
+    direct_ms = time_frames(frames, screen, game, layout, font, font_small)
+    ui.draw_card = cached_draw_card
+    cached_ms = time_frames(frames, screen, game, layout, font, font_small)
+    pygame.quit()
+
+    print(f"{cards} board cards, {frames} frames")
+    print(f"painted every frame: {direct_ms:6.3f} ms/frame")
+    print(f"cached sprites:      {cached_ms:6.3f} ms/frame  ({direct_ms / cached_ms:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
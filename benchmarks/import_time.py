@@ -0,0 +1,64 @@
+"""
+Import-time check for the headless game core.
+
+Worker processes and command line tools import game_logic.solitaire_game,
+so that import has to stay cheap and must never pull in pygame. Each
+module is imported in a fresh interpreter a few times and the fastest run
+is compared against the target.
+
+Usage:
+    python benchmarks/import_time.py
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# milliseconds allowed for importing the module itself (interpreter start-up
+# is not counted)
+TARGET_MS = 30.0
+RUNS = 5
+
+CORE_MODULES = [
+    "game_logic.solitaire_game",
+    "game_logic.auto_play",
+    "game_logic.parallel_search",
+    "batch_solver",
+]
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print((time.perf_counter() - start) * 1000, 'pygame' in sys.modules)
+"""
+
+def measure(module):
+    """fastest import time in ms over RUNS fresh interpreters, and whether pygame got loaded"""
+    best = None
+    loaded_pygame = False
+    for _ in range(RUNS):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        ms = float(out[0])
+        loaded_pygame = loaded_pygame or out[1] == "True"
+        best = ms if best is None else min(best, ms)
+    return best, loaded_pygame
+
+def main():
+    failed = False
+    for module in CORE_MODULES:
+        ms, loaded_pygame = measure(module)
+        ok = ms <= TARGET_MS and not loaded_pygame
+        failed = failed or not ok
+        note = " (imports pygame!)" if loaded_pygame else ""
+        print(f"{module:30s} {ms:7.1f} ms  {'ok' if ok else 'FAIL'}{note}")
+    print(f"target: {TARGET_MS:.0f} ms per module, no pygame")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -37,6 +37,8 @@ SUIT_COLORS = {
 }
 
 # game settings
+# cards turned over per draw (1 or 3) and how often the waste may be turned
+# back into the stock (None = no limit)
 DRAW_COUNT = 1
 MAX_RECYCLES = None
 
@@ -47,3 +49,38 @@ FOUNDATION_PILES = 4
 FOUNDATION_CARD_POINTS = 10
 REVEALED_CARD_POINTS = 2
 EMPTY_PILE_POINTS = 3
+
+# search settings
+# verify every incremental Zobrist key against a full recomputation and
+# the serialized state (slow, for debugging hash collisions)
+ZOBRIST_DEBUG = False
+# verify every incremental score against a full score_state (slow)
+SCORE_DEBUG = False
+
+# searches play the stock through macro-moves (draw until a card comes up,
+# then play it) instead of single draws; see game_logic/talon.py
+STOCK_MACRO_MOVES = True
+
+# transposition table shared by the tree search for a whole game
+TRANSPOSITION_TABLE_MB = 64
+TRANSPOSITION_POLICY = "depth"  # "depth" (depth-preferred) or "lru"
+
+# graph search: memory cap for its visited set and node arrays (the search
+# stops at the deepest finished level when it is reached) and whether the
+# visited set checks a Bloom filter before probing
+GRAPH_MEMORY_MB = 256
+FINGERPRINT_BLOOM = False
+
+# anytime search: hints deepen until the time budget (seconds) runs out
+HINT_TIME_BUDGET = 0.5
+SEARCH_MAX_DEPTH = 12
+
+# full-game solver (weighted A*): f = moves + SOLVER_WEIGHT * cards left;
+# 1.0 finds shortest wins, larger values find wins much faster (at most
+# SOLVER_WEIGHT times longer than the shortest)
+SOLVER_WEIGHT = 20.0
+SOLVER_NODE_BUDGET = 200000
+
+# worker processes for root-parallel hints (1 keeps the budgeted serial search)
+SEARCH_WORKERS = 1
+PARALLEL_SEARCH_DEPTH = 7
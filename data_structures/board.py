@@ -5,6 +5,15 @@ Implements game rules for tableau piles:
 - Kings only on empty piles
 - Descending rank with alternating colors
 - Supports sequences of face-up cards
+
+The pile keeps two pieces of metadata up to date as cards come and go, so
+nothing has to rescan the column:
+- face_down: how many face-down cards sit at the bottom; this is the only
+  place a card's face-up state is kept (cards are shared flyweights)
+- run_starts: for every card, the index where the valid face-up run ending
+  at that card begins (i + 1 for a face-down card). run_starts[-1] is the
+  start of the movable run on top of the pile.
+Read self.cards freely, but change the pile only through its methods.
 """
 
 from data_structures.cards import Card
@@ -13,57 +22,121 @@ from config import KING
 class BoardPile:
     def __init__(self):
         self.cards = []
-    
+        self.face_down = 0
+        self.run_starts = []
+
     def can_add(self, card: Card) -> bool:
         if len(self.cards) == 0:
             return card.rank == KING
-        
+
         # get the last revealed (face-up) card
         top_card = self._get_top_revealed_card()
         if top_card is None:
             return False
-        
+
         # must be descending rank (one less than top card)
         if card.rank != top_card.rank - 1:
             return False
-        
+
         # must alternate colors (red on black or black on red)
-        return self._opposite_colors(card, top_card)
-    
+        return card.red != top_card.red
+
     def add(self, card: Card) -> bool:
         if self.can_add(card):
-            card.revealed = True  # cards added to Board are face-up
-            self.cards.append(card)
+            self.push(card)  # cards added to Board are face-up
             return True
         return False
-    
+
+    def push(self, card: Card, face_up: bool = True):
+        # put a card on top without checking the rules (dealing, undo);
+        # face-down cards can only go on face-down cards
+        self.cards.append(card)
+        if not face_up:
+            self.face_down += 1
+        self.run_starts.append(self._run_start_of(len(self.cards) - 1))
+
+    def is_face_up(self, i: int) -> bool:
+        return i >= self.face_down
+
+    def _run_start_of(self, i: int) -> int:
+        # start of the face-up run ending at card i, from the card below it
+        if i < self.face_down:
+            return i + 1
+        if i > self.face_down:
+            card = self.cards[i]
+            below = self.cards[i - 1]
+            if below.rank == card.rank + 1 and below.red != card.red:
+                return self.run_starts[i - 1]
+        return i
+
+    def set_cards(self, cards: list, face_down: int = 0):
+        # replace the whole pile (the first face_down cards face-down) and
+        # rebuild the metadata
+        self.cards = []
+        self.face_down = 0
+        self.run_starts = []
+        for i, card in enumerate(cards):
+            self.push(card, i >= face_down)
+
     def _get_top_revealed_card(self) -> Card:
-        # get the last face-up card in the pile
-        for i in range(len(self.cards) - 1, -1, -1):
-            if self.cards[i].revealed:
-                return self.cards[i]
+        # face-down cards are only ever at the bottom, so a face-up card
+        # exists exactly when the top card is face-up
+        if len(self.cards) > self.face_down:
+            return self.cards[-1]
         return None
-    
+
     def _opposite_colors(self, card1: Card, card2: Card) -> bool:
         # check if cards are opposite colors
-        return card1.is_red() != card2.is_red()
-    
+        return card1.red != card2.red
+
+    def top_run_start(self) -> int:
+        # index of the first card of the movable run on top (len if none)
+        if self.run_starts:
+            return self.run_starts[-1]
+        return 0
+
     def peek(self) -> Card:
         # look at top card without removing
         if len(self.cards) > 0:
             return self.cards[-1]
         return None
-    
+
     def pop(self) -> Card:
         # remove and return top card
         if len(self.cards) > 0:
+            if self.face_down == len(self.cards):
+                self.face_down -= 1
+            self.run_starts.pop()
             return self.cards.pop()
         return None
-    
-    def reveal_top_card(self):
-        # flip the top card face-up if it exists and is face-down
-        if len(self.cards) > 0 and not self.cards[-1].revealed:
-            self.cards[-1].revealed = True
-    
+
+    def take_run(self, start_idx: int) -> list:
+        # remove and return the cards from start_idx to the top
+        run = self.cards[start_idx:]
+        del self.cards[start_idx:]
+        del self.run_starts[start_idx:]
+        self.face_down = min(self.face_down, start_idx)
+        return run
+
+    def put_run(self, run: list):
+        # put a run back on top face-up, without checking the rules (undo)
+        for card in run:
+            self.push(card)
+
+    def reveal_top_card(self) -> bool:
+        # flip the top card face-up if it exists and is face-down;
+        # returns whether a card was flipped
+        if len(self.cards) > 0 and self.face_down == len(self.cards):
+            self.face_down -= 1
+            self.run_starts[-1] = self._run_start_of(len(self.cards) - 1)
+            return True
+        return False
+
+    def hide_top_card(self):
+        # turn the top card back face-down (undoing reveal_top_card)
+        if len(self.cards) > 0 and self.face_down < len(self.cards):
+            self.face_down += 1
+            self.run_starts[-1] = len(self.cards)
+
     def size(self) -> int:
         return len(self.cards)
@@ -1,36 +1,66 @@
 """
 Card representation for Solitaire game.
 
-Provides the fundamental Card class with rank, suit, and visibility state.
-Includes helper methods for color checking and string representation.
+Cards are flyweights: there is exactly one Card object for every rank and
+suit, shared by all games and all search copies. Card(rank, suit) returns
+that object and copying or pickling a card gives it back as well. A card
+only holds its identity, with the suit index, colour and card code (0..51,
+the same as game_state.card_code) worked out once so the rule checks are
+plain attribute reads.
+
+Whether a card lies face-up is not part of the card but of where it is:
+board columns count their face-down cards (BoardPile.face_down), the stock
+is face-down and the waste and foundations are face-up.
 """
 
+from config import SUITS
+
+_RED_SUITS = ("H", "D")
+_SUIT_SYMBOLS = {"H": "♥", "D": "♦", "C": "♣", "S": "♠"}
+_RANK_NAMES = {1: "A", 11: "J", 12: "Q", 13: "K"}
+
 class Card:
-    def __init__(self, rank: int, suit: str, revealed=False):
-        self.rank = rank
-        self.suit = suit
-        self.revealed = revealed
+    __slots__ = ("rank", "suit", "suit_index", "red", "code", "name")
+
+    # (rank, suit) -> the one Card for it
+    _interned = {}
+
+    def __new__(cls, rank: int, suit: str):
+        card = cls._interned.get((rank, suit))
+        if card is None:
+            card = object.__new__(cls)
+            card.rank = rank
+            card.suit = suit
+            card.suit_index = SUITS.index(suit)
+            card.red = suit in _RED_SUITS
+            card.code = card.suit_index * 13 + rank - 1
+            card.name = _RANK_NAMES.get(rank, str(rank)) + _SUIT_SYMBOLS[suit]
+            cls._interned[(rank, suit)] = card
+        return card
+
+    # a card is its own copy
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (Card, (self.rank, self.suit))
 
     def get_rank(self) -> int:
         return self.rank
 
     def get_suit(self) -> str:
         return self.suit
-    
-    def flip(self):
-        # flip card face-up or face-down
-        self.revealed = not self.revealed
-    
+
     def is_red(self) -> bool:
         # check if card is red (hearts or diamonds)
-        return self.suit in ["H", "D"]
-    
+        return self.red
+
     def is_black(self) -> bool:
         # check if card is black (clubs or spades)
-        return self.suit in ["C", "S"]
-    
+        return not self.red
+
     def __repr__(self):
-        suit_symbols = {"H": "♥", "D": "♦", "C": "♣", "S": "♠"}
-        rank_names = {1: "A", 11: "J", 12: "Q", 13: "K"}
-        rank_str = rank_names.get(self.rank, str(self.rank))
-        return f"{rank_str}{suit_symbols[self.suit]}"
+        return self.name
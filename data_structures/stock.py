@@ -1,40 +1,32 @@
 from data_structures.cards import Card
-from data_structures.waste import WastePile
+from data_structures.talon import Talon
 
 class StockPile:
-    def __init__(self):
-        self.cards = []  # stack (list)
-    
+    # the face-down side of a talon (see data_structures/talon.py); the
+    # stock shares its talon with a WastePile
+    def __init__(self, talon: Talon = None):
+        self.talon = talon if talon is not None else Talon()
+
+    @property
+    def cards(self) -> list:
+        # copy of the stock as a stack, top card last
+        talon = self.talon
+        return list(reversed(talon.cards[talon.cursor:]))
+
     def draw(self) -> Card:
-        # remove and return top card
-        if len(self.cards) > 0:
-            return self.cards.pop()
+        # turn the top card over onto the waste and return it
+        talon = self.talon
+        if talon.draw(1):
+            return talon.cards[talon.cursor - 1]
         return None
-    
+
     def add(self, card: Card):
-        # add card to stock
-        card.revealed = False  # cards in stock are face-down
-        self.cards.append(card)
-    
+        # add card on top of the stock (face-down)
+        self.talon.put(self.talon.cursor, card)
+
     def is_empty(self) -> bool:
-        return len(self.cards) == 0
-    
-    def size(self) -> int:
-        return len(self.cards)
-    
-    def recycle_waste(self, waste:WastePile):
-        while len(waste.cards) > 0:
-            waste_card = waste.cards.pop(0)
-            waste_card.flip()
-            self.cards.append(waste_card)
+        return self.talon.stock_size() == 0
 
-    def recycle_from(self, waste: WastePile):
-        # Move all cards from waste back to stock, turning them face-down.
-        # The typical solitaire behavior is to take the waste top and make it the top of stock.
-        # Pop from the end of waste to preserve order when appended to stock.
-        while len(waste.cards) > 0:
-            card = waste.cards.pop()
-            card.revealed = False
-            self.cards.append(card)
+    def size(self) -> int:
+        return self.talon.stock_size()
 
-        
@@ -0,0 +1,72 @@
+"""
+Stock and waste stored together as one talon.
+
+Drawing turns stock cards over onto the waste in order and a reset turns
+the waste back over into the stock, so the two piles always hold their
+cards in the same cyclic order. The talon keeps them as one tuple in that
+order - the waste from bottom to top, then the stock in the order it will
+be drawn - and a cursor counting how many of them are on the waste:
+- draw: the cursor moves forward
+- reset: the cursor goes back to 0
+Neither touches the tuple. It is only rebuilt when a card leaves the
+talon (or comes back on undo), and since it is never changed in place a
+snapshot of the talon is just (cards, cursor), sharing the tuple.
+
+StockPile and WastePile are views of the two sides of one Talon.
+"""
+
+from data_structures.cards import Card
+
+class Talon:
+    __slots__ = ("cards", "cursor")
+
+    def __init__(self, cards=(), cursor: int = 0):
+        self.cards = tuple(cards)
+        self.cursor = cursor
+
+    def set(self, cards, cursor: int = 0):
+        # lay out the whole talon, the first cursor cards on the waste
+        self.cards = tuple(cards)
+        self.cursor = cursor
+
+    def snapshot(self) -> tuple:
+        return (self.cards, self.cursor)
+
+    def restore(self, snapshot: tuple):
+        self.cards, self.cursor = snapshot
+
+    def size(self) -> int:
+        return len(self.cards)
+
+    def stock_size(self) -> int:
+        return len(self.cards) - self.cursor
+
+    def top(self) -> Card:
+        # top card of the waste
+        if self.cursor > 0:
+            return self.cards[self.cursor - 1]
+        return None
+
+    def draw(self, count: int = 1) -> int:
+        # turn up to count stock cards over onto the waste; returns how many
+        start = self.cursor
+        self.cursor = min(start + count, len(self.cards))
+        return self.cursor - start
+
+    def recycle(self) -> int:
+        # turn the waste over into the stock; returns how many cards it held
+        moved = self.cursor
+        self.cursor = 0
+        return moved
+
+    def take(self, index: int) -> Card:
+        # remove the card at a talon index
+        cards = self.cards
+        card = cards[index]
+        self.cards = cards[:index] + cards[index + 1:]
+        return card
+
+    def put(self, index: int, card: Card):
+        # put a card back at a talon index (undoing take)
+        cards = self.cards
+        self.cards = cards[:index] + (card,) + cards[index:]
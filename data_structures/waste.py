@@ -1,31 +1,46 @@
 from data_structures.cards import Card
+from data_structures.talon import Talon
 
 class WastePile:
-    def __init__(self):
-        self.cards = []  # stack (list)
-    
+    # the face-up side of a talon (see data_structures/talon.py); the
+    # waste shares its talon with a StockPile
+    def __init__(self, talon: Talon = None):
+        self.talon = talon if talon is not None else Talon()
+
+    @property
+    def cards(self) -> list:
+        # copy of the waste, top card last
+        talon = self.talon
+        return list(talon.cards[:talon.cursor])
+
     def add(self, card: Card):
-        card.revealed = True  # cards in waste are always face-up
-        self.cards.append(card)
-    
+        # cards in waste are always face-up
+        talon = self.talon
+        talon.put(talon.cursor, card)
+        talon.cursor += 1
+
     def peek(self) -> Card:
         # look at top card without removing
-        if len(self.cards) > 0:
-            return self.cards[-1]
+        talon = self.talon
+        if talon.cursor > 0:
+            return talon.cards[talon.cursor - 1]
         return None
-    
+
     def pop(self) -> Card:
         # remove and return top card
-        if len(self.cards) > 0:
-            return self.cards.pop()
+        talon = self.talon
+        if talon.cursor > 0:
+            talon.cursor -= 1
+            return talon.take(talon.cursor)
         return None
-    
+
     def is_empty(self) -> bool:
-        return len(self.cards) == 0
-    
+        return self.talon.cursor == 0
+
     def size(self) -> int:
-        return len(self.cards)
-    
+        return self.talon.cursor
+
     def clear(self):
-        # remove all cards (used when recycling waste to stock)
-        self.cards.clear()
+        # remove all cards from the waste
+        talon = self.talon
+        talon.set(talon.cards[talon.cursor:])
@@ -0,0 +1,120 @@
+"""
+Helpers for the AI auto-play buttons.
+
+Pick the move (or the whole line, for the plan cache) the AI would play and
+detect when auto-play is stuck going back and forth. Search modules are
+imported lazily so importing this module stays cheap.
+"""
+
+
+def detect_move_cycle(move_history, threshold=8):
+    """detect if the same moves are being reversed repeatedly or stuck in patterns"""
+    if len(move_history) < 16:
+        return False
+    
+    # check for immediate reversals (A->B, B->A) - must be consecutive
+    reversal_count = 0
+    i = len(move_history) - 1
+    
+    while i >= 1 and reversal_count < threshold:
+        current = move_history[i]
+        previous = move_history[i - 1]
+        
+        if (current.get("from") == previous.get("to") and 
+            current.get("to") == previous.get("from") and
+            current.get("type") == previous.get("type")):
+            reversal_count += 1
+            i -= 2
+        else:
+            break
+    
+    # only trigger if we have 8+ consecutive reversals
+    if reversal_count >= threshold:
+        return True
+    
+    # check for repeated move patterns (same move made many times)
+    recent_moves = move_history[-30:]
+    if len(recent_moves) >= 20:
+        # count how many times the last move appears in recent history
+        last_move = recent_moves[-1]
+        last_move_str = f"{last_move.get('type')}_{last_move.get('from')}_{last_move.get('to')}"
+        
+        count = 0
+        for move in recent_moves:
+            move_str = f"{move.get('type')}_{move.get('from')}_{move.get('to')}"
+            if move_str == last_move_str:
+                count += 1
+        
+        # only trigger if same move made 10+ times in last 30 moves
+        if count >= 10:
+            return True
+    
+    # check for state oscillation (last 4 moves repeat 3+ times)
+    if len(move_history) >= 24:
+        pattern = move_history[-4:]
+        pattern_str = [f"{m.get('type')}_{m.get('from')}_{m.get('to')}" for m in pattern]
+        
+        # check if this 4-move pattern has repeated at least 3 times
+        repeat_count = 0
+        for i in range(len(move_history) - 4, -4, -4):
+            if i < 0:
+                break
+            check_pattern = move_history[i:i+4]
+            check_pattern_str = [f"{m.get('type')}_{m.get('from')}_{m.get('to')}" for m in check_pattern]
+            if check_pattern_str == pattern_str:
+                repeat_count += 1
+            else:
+                break
+        
+        if repeat_count >= 3:
+            return True
+    
+    return False
+
+
+def get_best_move_tree_object(game, depth=6, recent_moves=None, force_draw=False, table=None, time_budget=None, cancel=None):
+    """get the actual Move object from tree algorithm, with the depth its search completed"""
+    from game_logic.best_move_tree import search_best_move, search_best_move_iterative
+    from game_logic.move_utils import DRAW_STOCK
+    from game_logic.search_limits import SearchLimits
+    
+    # if forced draw and stock has cards, draw immediately
+    if force_draw and game.stock.size() > 0:
+        return DRAW_STOCK, 0
+    
+    # with a time budget, depth is the deepest iteration allowed
+    if time_budget is not None:
+        limits = SearchLimits(time_budget, cancel=cancel)
+        score, move, depth = search_best_move_iterative(game, depth, recent_moves=recent_moves, table=table, limits=limits)
+    else:
+        limits = SearchLimits(cancel=cancel) if cancel is not None else None
+        score, move = search_best_move(game, depth, recent_moves=recent_moves, table=table, limits=limits)
+    
+    # if no good move found and we have stock, force draw
+    if (not move or score < 0) and game.stock.size() > 0:
+        return DRAW_STOCK, 0
+    
+    return move, depth
+
+def get_best_plan_tree_object(game, depth=6, recent_moves=None, force_draw=False, table=None, time_budget=None, cancel=None):
+    """get the tree algorithm's best line (its principal variation) as Move objects"""
+    from game_logic.best_move_tree import principal_variation
+    from game_logic.move_utils import DRAW_STOCK
+    move, depth_reached = get_best_move_tree_object(game, depth, recent_moves, force_draw, table, time_budget, cancel)
+    if move is None:
+        return []
+    # the line is read back from the table's best moves, no deeper than the
+    # last iteration the search finished
+    if move == DRAW_STOCK or table is None:
+        return [move]
+    return principal_variation(game, move, table, depth_reached)
+
+def get_best_plan_graph_object(game, max_depth=4, time_budget=None, cancel=None):
+    """get the whole line of Move objects the graph algorithm found"""
+    from game_logic.best_move_graph import search_best_line_graph
+    from game_logic.search_limits import SearchLimits
+    limits = None
+    if time_budget is not None or cancel is not None:
+        limits = SearchLimits(time_budget, cancel=cancel)
+    score, line = search_best_line_graph(game, max_depth, limits)
+    return line
@@ -6,115 +6,131 @@ Explores states level by level, maintaining a visited set to avoid cycles.
 Uses a queue (deque) for efficient frontier management and guarantees
 finding the shortest path if one exists within the time limit.
 
+Nodes are kept as parent index + encoded move in flat arrays (see
+search_nodes.py) rather than as games or move paths, and the one shared
+game is walked from node to node with do_move/undo_move. Visited states
+are tracked by their incremental 64-bit Zobrist key in a compact
+FingerprintSet and scored by an incremental ScoreTracker that follows the
+same walk. Stock cards are reached through macro-moves (see talon.py)
+rather than one draw per level.
+
+With a time or node budget, or once GRAPH_MEMORY_MB is used up, the search
+stops early and answers with the best state found on the deepest level it
+finished exploring. search_best_line_graph returns the whole line to the
+best (or winning) state, rebuilt from the parent links, so auto-play can
+follow it without searching again at every step.
+
 Algorithm: BFS with visited set
 Time Complexity: O(V + E) where V=states, E=transitions
 Space Complexity: O(V) for visited set and queue
 """
 
-from collections import deque
 import time
-from .move_utils import Move, serialize_state, score_state, apply_move
+from config import GRAPH_MEMORY_MB
+from .move_utils import do_move, undo_move, get_search_moves, describe_move
+from .zobrist import ZobristHasher
+from .score_tracker import ScoreTracker
+from .search_limits import SearchLimits, SearchAborted
+from .search_nodes import SearchNodes, NodeWalker, ROOT
+from .deal_codec import DECK_SIZE
+from .fingerprint_set import FingerprintSet, MemoryCapReached
 
-def _is_valid_sequence(pile, start_idx):
-    """check if cards from start_idx to end form a valid sequence"""
-    if start_idx < 0 or start_idx >= len(pile.cards):
-        return False
-    # all cards in sequence must be revealed
-    for i in range(start_idx, len(pile.cards)):
-        if not pile.cards[i].revealed:
-            return False
-    # check ordering: descending rank, alternating colors
-    for i in range(start_idx, len(pile.cards) - 1):
-        a = pile.cards[i]
-        b = pile.cards[i + 1]
-        if a.rank != b.rank + 1:
-            return False
-        if a.is_red() == b.is_red():
-            return False
-    return True
+def search_best_line_graph(game, max_depth=4, limits=None, max_mb=GRAPH_MEMORY_MB):
+    """
+    BFS from the current state; returns (best_score, moves to the best
+    state). A won state ends the search at once, and BFS reaches it by a
+    shortest line.
 
-def get_legal_moves(game):
-    moves = []
-    if game.waste.size() > 0:
-        card = game.waste.peek()
-        if game.foundations[card.suit].can_add(card):
-            moves.append(Move("waste_to_foundation", {"card": card}))
-        for i, pile in enumerate(game.Board):
-            if pile.can_add(card):
-                moves.append(Move("waste_to_Board", {"column": i, "card": card}))
-    for i, pile in enumerate(game.Board):
-        if pile.size() == 0:
-            continue
-        # find all valid sequences starting from each revealed card
-        for start_idx in range(len(pile.cards)):
-            if not pile.cards[start_idx].revealed:
-                continue
-            if not _is_valid_sequence(pile, start_idx):
+    If limits or the max_mb memory cap runs out, the answer comes from the
+    last fully explored level and limits.depth_reached says which level
+    that was.
+    """
+    nodes = SearchNodes()
+    visited = FingerprintSet(max_mb)
+    max_bytes = None if max_mb is None else max_mb * 1024 * 1024
+    best_node = ROOT
+    best_score = -float("inf")
+    # best result over the levels that have been completely generated
+    done_score, done_node = best_score, best_node
+    level = 0
+    hasher = ZobristHasher(game)
+    scorer = ScoreTracker(game)
+    walker = NodeWalker(game, nodes, (hasher, scorer))
+    visited.add(hasher.key)
+    depths = nodes.depths
+    # nodes are expanded in the order they were created, so the node
+    # arrays are the BFS queue
+    head = 0
+    try:
+        while head < len(nodes):
+            node = head
+            head += 1
+            depth = depths[node]
+            if depth > max_depth:
                 continue
-            card = pile.cards[start_idx]
-            # can move to foundation (only if it's the top card)
-            if start_idx == len(pile.cards) - 1 and game.foundations[card.suit].can_add(card):
-                moves.append(Move("Board_to_foundation", {"from": i, "card": card, "start_idx": start_idx}))
-            # can move sequence to another Board pile (including empty piles)
-            for j, dst in enumerate(game.Board):
-                if i == j:
-                    continue
-                if dst.can_add(card):
-                    moves.append(Move("Board_to_Board", {"from": i, "to": j, "card": card, "start_idx": start_idx}))
-    if game.stock.size() > 0:
-        moves.append(Move("draw_stock", {}))
-    elif game.waste.size() > 0:
-        moves.append(Move("reset_stock", {}))
-    return moves
+            if depth > level:
+                # every node of the previous level is expanded, so all of this
+                # level's states have been scored
+                level = depth
+                done_score, done_node = best_score, best_node
+                if limits is not None:
+                    limits.depth_reached = level
+            # the root is always expanded so there is at least one move to suggest
+            if depth > 0:
+                if limits is not None:
+                    limits.tick()
+                if max_bytes is not None and nodes.nbytes() + visited.nbytes() > max_bytes:
+                    raise MemoryCapReached()
+            walker.go_to(node)
+            for move in get_search_moves(game):
+                undo = do_move(game, move)
+                try:
+                    hasher.push(game, move, undo)
+                    state_key = hasher.key
+                    hasher.pop()
+                    # add raises MemoryCapReached when the set cannot grow;
+                    # the finally still takes the move back first
+                    if not visited.add(state_key):
+                        continue
+                    scorer.push(game, move, undo)
+                    score = scorer.score
+                    won = scorer.state[0] == DECK_SIZE
+                    scorer.pop()
+                finally:
+                    undo_move(game, move, undo)
+                child = nodes.add(node, move)
+                if won:
+                    # nothing beats a win and nothing shorter is left to find
+                    if limits is not None:
+                        limits.depth_reached = depth + 1
+                    return score, nodes.line(child)
+                if score > best_score:
+                    best_score = score
+                    best_node = child
+    except SearchAborted:
+        # out of time, nodes or memory (MemoryCapReached is a SearchAborted)
+        return done_score, nodes.line(done_node)
+    finally:
+        walker.go_to(ROOT)
+    if limits is not None:
+        limits.depth_reached = level + 1
+    return best_score, nodes.line(best_node)
 
-def describe_move(move):
-    if not move:
-        return "No move found"
-    if move.move_type == "Board_to_Board":
-        return f"Move {move.details['card']} from column {move.details['from']} to column {move.details['to']}"
-    if move.move_type == "Board_to_foundation":
-        return f"Move {move.details['card']} from column {move.details['from']} to the foundation"
-    if move.move_type == "waste_to_Board":
-        return f"Move {move.details['card']} from waste to column {move.details['column']}"
-    if move.move_type == "waste_to_foundation":
-        return f"Move {move.details['card']} from waste to the foundation"
-    if move.move_type == "draw_stock":
-        return "Draw a card from the stock"
-    if move.move_type == "reset_stock":
-        return "Reset the stock"
-    return f"Move: {move}"
+def search_best_move_graph(game, max_depth=4, limits=None, max_mb=GRAPH_MEMORY_MB):
+    """BFS from the current state; returns (best_score, first move towards it)"""
+    best_score, line = search_best_line_graph(game, max_depth, limits, max_mb)
+    return best_score, line[0] if line else None
 
-
-
-def find_best_move_graph(game, max_depth=4):
+def find_best_move_graph(game, max_depth=4, time_budget=None, node_budget=None, cancel=None):
     start_time = time.time()
-    visited = set()
-    queue = deque()
-    best_move = None
-    best_score = -float("inf")
-    root_state = serialize_state(game)
-    queue.append((game, 0, None))
-    visited.add(root_state)
-    while queue:
-        current_game, depth, first_move = queue.popleft()
-        if depth > max_depth:
-            continue
-        legal_moves = get_legal_moves(current_game)
-        for move in legal_moves:
-            new_game = apply_move(current_game, move)
-            state_key = serialize_state(new_game)
-            if state_key in visited:
-                continue
-            visited.add(state_key)
-            score = score_state(new_game)
-            move_to_use = first_move if first_move else move
-            if score > best_score:
-                best_score = score
-                best_move = move_to_use
-            queue.append((new_game, depth+1, move_to_use))
+    limits = None
+    if time_budget is not None or node_budget is not None or cancel is not None:
+        limits = SearchLimits(time_budget, node_budget, cancel)
+    best_score, best_move = search_best_move_graph(game, max_depth, limits)
     elapsed_ms = (time.time() - start_time) * 1000
-    print(f"Best move using graph: {best_move} | Computed in {elapsed_ms:.0f}ms")
+    depth_info = f" | depth {limits.depth_reached}" if limits else ""
+    print(f"Best move using graph: {best_move} | Computed in {elapsed_ms:.0f}ms{depth_info}")
 
-    move_text = describe_move(best_move)
+    move_text = describe_move(best_move, game)
 
     return move_text
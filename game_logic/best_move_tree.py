@@ -3,8 +3,20 @@ Tree-based AI for Solitaire using Depth-First Search.
 
 Implements a recursive DFS algorithm with memoization to find optimal moves.
 Explores the game tree up to a specified depth, scoring each state and
-selecting moves that lead to higher scores. Uses state serialization to
-avoid revisiting previously explored positions.
+selecting moves that lead to higher scores. Uses incremental Zobrist keys to
+avoid revisiting previously explored positions. A single game state is
+mutated in place with do_move and restored with undo_move while walking
+the tree, instead of copying the game for every child. An optional
+transposition table that outlives a single search lets later hint requests
+reuse scores and best moves from earlier ones. The stock is searched
+through macro-moves (see talon.py), so a whole chain of draws costs one ply.
+
+An anytime mode (search_best_move_iterative) deepens one ply at a time
+until a time or node budget runs out and returns the best move of the
+deepest completed iteration, trying the previous iteration's best line
+first at every level. Because that line's root move is searched first, an
+iteration the budget cuts short can still improve on it with the root
+moves it finished.
 
 Algorithm: DFS with memoization
 Time Complexity: O(b^d) where b=branching factor, d=depth
@@ -13,148 +25,182 @@ Space Complexity: O(d) for recursion + O(n) for memo
 
 import time
 import random
-from .move_utils import Move, serialize_state, score_state, apply_move
-
-# ---------------- LEGAL MOVES ----------------
-def _is_valid_sequence(pile, start_idx):
-    """check if cards from start_idx to end form a valid sequence"""
-    if start_idx < 0 or start_idx >= len(pile.cards):
-        return False
-    # all cards in sequence must be revealed
-    for i in range(start_idx, len(pile.cards)):
-        if not pile.cards[i].revealed:
-            return False
-    # check ordering: descending rank, alternating colors
-    for i in range(start_idx, len(pile.cards) - 1):
-        a = pile.cards[i]
-        b = pile.cards[i + 1]
-        if a.rank != b.rank + 1:
-            return False
-        if a.is_red() == b.is_red():
-            return False
-    return True
-
-def get_legal_moves(game):
-    moves = []
-    if game.waste.size() > 0:
-        card = game.waste.peek()
-        if game.foundations[card.suit].can_add(card):
-            moves.append(Move("waste_to_foundation", {"card": card}))
-        for i, pile in enumerate(game.Board):
-            if pile.can_add(card):
-                moves.append(Move("waste_to_Board", {"column": i, "card": card}))
-    for i, pile in enumerate(game.Board):
-        if pile.size() == 0:
+from .move_utils import (do_move, undo_move, get_search_moves, describe_move, history_entry,
+                         cheapest_moves, FOUNDATION_MOVE_TYPES)
+from .zobrist import ZobristHasher, zobrist_key
+from .score_tracker import ScoreTracker
+from .transposition import TranspositionTable, EXACT, LOWER_BOUND, move_signature, find_move
+from .search_limits import SearchLimits, SearchAborted
+
+# cycle ply reported by subtrees that cut no cycle above themselves
+NO_CYCLE = 1 << 30
+
+# ---------------- ROOT MOVE FILTER ----------------
+def filter_recent_moves(legal_moves, recent_moves):
+    """drop root moves that repeat the recent move history (unless all would be dropped)"""
+    filtered_moves = []
+    blocked_moves = []
+    
+    for move in legal_moves:
+        entry = history_entry(move)
+        move_str = f"{entry['type']}_{entry['from']}_{entry['to']}"
+        
+        # NEVER block foundation moves - they're always good
+        if "foundation" in move.move_type:
+            filtered_moves.append(move)
             continue
-        # find all valid sequences starting from each revealed card
-        for start_idx in range(len(pile.cards)):
-            if not pile.cards[start_idx].revealed:
-                continue
-            if not _is_valid_sequence(pile, start_idx):
-                continue
-            card = pile.cards[start_idx]
-            # can move to foundation (only if it's the top card)
-            if start_idx == len(pile.cards) - 1 and game.foundations[card.suit].can_add(card):
-                moves.append(Move("Board_to_foundation", {"from": i, "card": card, "start_idx": start_idx}))
-            # can move sequence to another Board pile
-            for j, dst in enumerate(game.Board):
-                if i == j:
-                    continue
-                if dst.can_add(card):
-                    moves.append(Move("Board_to_Board", {"from": i, "to": j, "card": card, "start_idx": start_idx}))
-    if game.stock.size() > 0:
-        moves.append(Move("draw_stock", {}))
-    elif game.waste.size() > 0:
-        moves.append(Move("reset_stock", {}))
-    return moves
+        
+        # count how many times this exact move appears in recent history
+        recent_count = 0
+        for i, recent in enumerate(recent_moves[-10:]):
+            recent_str = f"{recent.get('type')}_{recent.get('from')}_{recent.get('to')}"
+            if recent_str == move_str:
+                recent_count += 1
+        
+        # check if this move was made in last 3 moves (immediate repeat)
+        immediate_repeat = False
+        if len(recent_moves) >= 3:
+            last_three = recent_moves[-3:]
+            for recent in last_three:
+                recent_str = f"{recent.get('type')}_{recent.get('from')}_{recent.get('to')}"
+                if recent_str == move_str:
+                    immediate_repeat = True
+                    break
+        
+        # block move if made 3+ times recently OR repeated in last 3 moves
+        if recent_count >= 3 or immediate_repeat:
+            blocked_moves.append(move)
+        else:
+            filtered_moves.append(move)
+    
+    # use filtered moves if we have any, otherwise fall back to all moves
+    if filtered_moves:
+        legal_moves = filtered_moves
+    else:
+        # all moves are blocked, so allow them but we're probably stuck
+        legal_moves = legal_moves
+    return legal_moves
+
+def move_priority(m):
+    if m.move_type in FOUNDATION_MOVE_TYPES:
+        return 3
+    elif m.move_type in ["Board_to_Board", "waste_to_Board", "talon_to_Board"]:
+        return 2
+    elif m.move_type == "draw_stock":
+        return 1
+    else:
+        return 0
+
+def pick_best_move(game, best_moves):
+    """choose between moves whose scores tie"""
+    # if multiple moves have the same score, prefer foundation moves
+    if len(best_moves) > 1:
+        foundation_moves_best = [m for m in best_moves if m.move_type in FOUNDATION_MOVE_TYPES]
+        if foundation_moves_best:
+            return random.choice(foundation_moves_best)
+        # avoid drawing from stock if other options exist, and of the
+        # macro-moves left prefer the ones with the fewest draws
+        non_draw_moves = [m for m in best_moves if m.move_type not in ["draw_stock", "reset_stock"]]
+        if non_draw_moves:
+            return random.choice(cheapest_moves(game, non_draw_moves))
+        return random.choice(best_moves)
+    return best_moves[0] if best_moves else None
 
 # ---------------- TREE SEARCH WITH CYCLE DETECTION ----------------
-def search_best_move(game, depth=6, visited=None, alpha=-float("inf"), recent_moves=None):
+def search_best_move(game, depth=6, visited=None, alpha=-float("inf"), recent_moves=None, hasher=None, table=None, ply=0, limits=None, pv=None, scorer=None):
+    """
+    returns (score, best move) for the state, searched depth plies deep;
+    visited maps the keys of the states on the path above to their ply
+    """
+    score, move, _ = _search(game, depth, visited, alpha, recent_moves, hasher, table, ply, limits, pv, scorer)
+    return score, move
+
+def _search(game, depth, visited, alpha, recent_moves, hasher, table, ply, limits, pv, scorer):
+    """
+    search_best_move's recursion; also returns the shallowest ply of a state
+    on the path that the search ran back into (NO_CYCLE if none). Only such
+    cycles above ply make the score depend on the path, so only then is it
+    stored as a LOWER_BOUND; cycles back to this node or into its own
+    subtree cut the same branches whichever way the node is reached
+    """
     if visited is None:
-        visited = set()
-    state_key = serialize_state(game)
+        visited = {}
+    if hasher is None:
+        hasher = ZobristHasher(game)
+    if scorer is None:
+        scorer = ScoreTracker(game)
+    state_key = hasher.key
     if state_key in visited:
-        return -float("inf"), None
-    visited.add(state_key)
+        return -float("inf"), None, visited[state_key]
+
+    # reuse a previous search of this position (never at the root, where
+    # the recent-move filter changes which moves are considered); only at
+    # the same depth, because every foundation move on the way adds 1000
+    # and scores from different depths do not compare
+    tt_entry = None
+    if table is not None and ply > 0 and depth > 0:
+        tt_entry = table.probe(state_key)
+        if tt_entry is not None and tt_entry.depth == depth and tt_entry.bound == EXACT:
+            return tt_entry.score, None, NO_CYCLE
+    if limits is not None:
+        limits.tick()
+    # leaves and dead ends stay in visited for the rest of the search
+    visited[state_key] = ply
 
     if depth == 0:
-        return score_state(game), None
+        return scorer.score, None, NO_CYCLE
 
-    legal_moves = get_legal_moves(game)
+    legal_moves = get_search_moves(game)
     if not legal_moves:
-        return score_state(game), None
+        return scorer.score, None, NO_CYCLE
 
     # HARD FILTER: block recently repeated moves at root level
-    if recent_moves and depth == 6:
-        filtered_moves = []
-        blocked_moves = []
-        
-        for move in legal_moves:
-            move_str = f"{move.move_type}_{move.details.get('from')}_{move.details.get('to')}"
-            
-            # NEVER block foundation moves - they're always good
-            if "foundation" in move.move_type:
-                filtered_moves.append(move)
-                continue
-            
-            # count how many times this exact move appears in recent history
-            recent_count = 0
-            for i, recent in enumerate(recent_moves[-10:]):
-                recent_str = f"{recent.get('type')}_{recent.get('from')}_{recent.get('to')}"
-                if recent_str == move_str:
-                    recent_count += 1
-            
-            # check if this move was made in last 3 moves (immediate repeat)
-            immediate_repeat = False
-            if len(recent_moves) >= 3:
-                last_three = recent_moves[-3:]
-                for recent in last_three:
-                    recent_str = f"{recent.get('type')}_{recent.get('from')}_{recent.get('to')}"
-                    if recent_str == move_str:
-                        immediate_repeat = True
-                        break
-            
-            # block move if made 3+ times recently OR repeated in last 3 moves
-            if recent_count >= 3 or immediate_repeat:
-                blocked_moves.append(move)
-            else:
-                filtered_moves.append(move)
-        
-        # use filtered moves if we have any, otherwise fall back to all moves
-        if filtered_moves:
-            legal_moves = filtered_moves
-        else:
-            # all moves are blocked, so allow them but we're probably stuck
-            legal_moves = legal_moves
+    if recent_moves and ply == 0:
+        legal_moves = filter_recent_moves(legal_moves, recent_moves)
 
     # ALWAYS PREFER FOUNDATION MOVES - they're always correct
-    foundation_moves = [m for m in legal_moves if "foundation" in m.move_type]
-    if foundation_moves and depth == 6:
+    foundation_moves = [m for m in legal_moves if m.move_type in FOUNDATION_MOVE_TYPES]
+    if foundation_moves and ply == 0:
         # at root level, if we can move to foundation, DO IT
-        return 1000.0, random.choice(foundation_moves)
+        return 1000.0, random.choice(foundation_moves), NO_CYCLE
     
     # Move ordering: foundation moves first
-    def move_priority(m):
-        if m.move_type in ["waste_to_foundation", "Board_to_foundation"]:
-            return 3
-        elif m.move_type in ["Board_to_Board", "waste_to_Board"]:
-            return 2
-        elif m.move_type == "draw_stock":
-            return 1
-        else:
-            return 0
     legal_moves.sort(key=move_priority, reverse=True)
+    # try the best move remembered for this position first
+    if tt_entry is not None:
+        tt_move = find_move(game, legal_moves, tt_entry.move)
+        if tt_move is not None:
+            legal_moves.remove(tt_move)
+            legal_moves.insert(0, tt_move)
+    # the previous iteration's best line goes before everything else
+    pv_move = None
+    if pv:
+        pv_move = next((m for m in legal_moves if m == pv[0]), None)
+        if pv_move is not None:
+            legal_moves.remove(pv_move)
+            legal_moves.insert(0, pv_move)
 
     best_score = -float("inf")
     best_moves = []
+    cycle_ply = NO_CYCLE
 
     for move in legal_moves:
-        new_game = apply_move(game, move)
-        # share visited set within the same branch to prevent cycles
-        score, _ = search_best_move(new_game, depth - 1, visited, alpha=alpha, recent_moves=None)
+        undo = do_move(game, move)
+        hasher.push(game, move, undo)
+        scorer.push(game, move, undo)
+        try:
+            # share visited set within the same branch to prevent cycles
+            score, _, child_cycle = _search(game, depth - 1, visited, alpha, None, hasher, table,
+                                            ply + 1, limits, pv[1:] if move is pv_move else None, scorer)
+        finally:
+            # also runs when the budget aborts the search, leaving the game intact
+            undo_move(game, move, undo)
+            hasher.pop()
+            scorer.pop()
+        cycle_ply = min(cycle_ply, child_cycle)
         
         # MASSIVE bonus for foundation moves
-        if "foundation" in move.move_type:
+        if move.move_type in FOUNDATION_MOVE_TYPES:
             score += 1000.0
         
         # add random noise to break ties and ensure variety
@@ -167,48 +213,104 @@ def search_best_move(game, depth=6, visited=None, alpha=-float("inf"), recent_mo
         # update alpha to track best score found so far
         if best_score > alpha:
             alpha = best_score
+        if ply == 0 and limits is not None:
+            # root moves searched so far, for an iteration cut short
+            limits.root_done.append(move)
+            limits.root_best = (best_score, list(best_moves))
     
-    # if multiple moves have the same score, prefer foundation moves
-    if len(best_moves) > 1:
-        foundation_moves_best = [m for m in best_moves if "foundation" in m.move_type]
-        if foundation_moves_best:
-            best_move = random.choice(foundation_moves_best)
+    best_move = pick_best_move(game, best_moves)
+
+    del visited[state_key]  # backtrack: allow revisiting this state in other branches
+    if cycle_ply >= ply:
+        # no cut reaches above this node, so the score holds for any path
+        cycle_ply = NO_CYCLE
+    if table is not None and ply > 0:
+        bound = EXACT if cycle_ply == NO_CYCLE else LOWER_BOUND
+        table.store(state_key, depth, best_score, move_signature(game, best_move), bound)
+    return best_score, best_move, cycle_ply
+
+def principal_variation(game, first_move, table, depth):
+    """
+    follow the table's best moves from the root to rebuild the best line;
+    only entries searched as deep as a depth-deep search from the root
+    reaches them count, so the line never runs into shallower results left
+    by earlier or aborted searches
+    """
+    line = []
+    undos = []
+    move = first_move
+    while move is not None and len(line) < depth:
+        line.append(move)
+        undos.append(do_move(game, move))
+        entry = table.peek(zobrist_key(game))
+        if entry is not None and entry.depth >= depth - len(line):
+            move = find_move(game, get_search_moves(game), entry.move)
         else:
-            # avoid drawing from stock if other options exist
-            non_draw_moves = [m for m in best_moves if m.move_type not in ["draw_stock", "reset_stock"]]
-            if non_draw_moves:
-                best_move = random.choice(non_draw_moves)
-            else:
-                best_move = random.choice(best_moves)
-    else:
-        best_move = best_moves[0] if best_moves else None
-
-    visited.remove(state_key)  # backtrack: allow revisiting this state in other branches
-    return best_score, best_move
-
-# ---------------- HUMAN-READABLE MOVE ----------------
-def describe_move(move):
-    if not move:
-        return "No move found"
-    if move.move_type == "Board_to_Board":
-        return f"Move {move.details['card']} from column {move.details['from']} to column {move.details['to']}"
-    if move.move_type == "Board_to_foundation":
-        return f"Move {move.details['card']} from column {move.details['from']} to the foundation"
-    if move.move_type == "waste_to_Board":
-        return f"Move {move.details['card']} from waste to column {move.details['column']}"
-    if move.move_type == "waste_to_foundation":
-        return f"Move {move.details['card']} from waste to the foundation"
-    if move.move_type == "draw_stock":
-        return "Draw a card from the stock"
-    if move.move_type == "reset_stock":
-        return "Reset the stock"
-    return f"Move: {move}"
+            move = None
+    for m, undo in zip(reversed(line), reversed(undos)):
+        undo_move(game, m, undo)
+    return line
+
+# ---------------- ITERATIVE DEEPENING ----------------
+def search_best_move_iterative(game, max_depth=12, time_budget=None, node_budget=None, recent_moves=None, table=None, limits=None):
+    """
+    Anytime tree search: search depth 1, 2, ... until the budget runs out.
+
+    Returns (score, move, depth) from the deepest completed iteration.
+    Depth 1 always completes so there is a move to suggest. When the budget
+    cuts an iteration short after the previous best move (searched first)
+    has finished, the best of the root moves finished so far is returned
+    instead, since it was compared against that move at the deeper depth;
+    depth still names the last completed iteration.
+    """
+    if limits is None:
+        limits = SearchLimits(time_budget, node_budget)
+    if table is None:
+        table = TranspositionTable(max_mb=8)
+    best_score, best_move = search_best_move(game, 1, recent_moves=recent_moves, table=table)
+    limits.depth_reached = 1
+    pv = principal_variation(game, best_move, table, 1)
+    for depth in range(2, max_depth + 1):
+        limits.root_done = []
+        limits.root_best = None
+        try:
+            score, move = search_best_move(game, depth, recent_moves=recent_moves, table=table, limits=limits, pv=pv)
+        except SearchAborted:
+            if best_move in limits.root_done:
+                best_score, best_moves = limits.root_best
+                best_move = pick_best_move(game, best_moves)
+            break
+        best_score, best_move = score, move
+        limits.depth_reached = depth
+        pv = principal_variation(game, best_move, table, depth)
+    return best_score, best_move, limits.depth_reached
 
 # ---------------- FIND BEST MOVE ----------------
-def find_best_move(game, depth=6, recent_moves=None):
+def find_best_move(game, depth=6, recent_moves=None, table=None, time_budget=None, node_budget=None, workers=None, cancel=None):
+    """
+    with a time or node budget, depth is the deepest iteration allowed;
+    with more than one worker, depth is searched root-parallel instead.
+    Setting the cancel event raises SearchAborted (budgeted searches just
+    stop at their last completed depth).
+    """
     start_time = time.time()
-    score, move = search_best_move(game, depth, recent_moves=recent_moves)
+    depth_info = ""
+    if workers is not None and workers > 1:
+        from .parallel_search import search_best_move_parallel
+        score, move = search_best_move_parallel(game, depth, recent_moves=recent_moves, workers=workers, cancel=cancel)
+        depth_info = f" | {workers} workers"
+    elif time_budget is None and node_budget is None:
+        limits = SearchLimits(cancel=cancel) if cancel is not None else None
+        score, move = search_best_move(game, depth, recent_moves=recent_moves, table=table, limits=limits)
+    else:
+        limits = SearchLimits(time_budget, node_budget, cancel)
+        score, move, reached = search_best_move_iterative(game, depth, recent_moves=recent_moves, table=table, limits=limits)
+        depth_info = f" | depth {reached}"
     elapsed_ms = (time.time() - start_time) * 1000
-    move_str = describe_move(move)
-    print(f"Tree search best move: {move_str} | Computed in {elapsed_ms:.0f}ms")
+    move_str = describe_move(move, game)
+    table_info = ""
+    if table is not None:
+        stats = table.stats()
+        table_info = f" | TT hits {stats['hits']}/{stats['hits'] + stats['misses']}, {stats['entries']} entries"
+    print(f"Tree search best move: {move_str} | Computed in {elapsed_ms:.0f}ms{depth_info}{table_info}")
     return move_str
@@ -0,0 +1,84 @@
+"""
+Card location index and static "can go on" tables for Solitaire.
+
+Answers "where is 5♥?" without scanning the piles.
+
+CardLocations maps each of the 52 cards (by card code, see game_state) to
+the pile it is in and its position in that pile. Every SolitaireGame keeps
+one in game.locations; do_move/undo_move update it for the cards they move
+and GameState.to_game rebuilds it. Piles are numbered:
+- 0..6   board columns
+- 7      talon (stock and waste, see data_structures/talon.py); the
+         position is the talon index, so a draw or reset moves no card
+- 8..11  foundations, in SUITS order
+
+The tables never change, since they only depend on the rules:
+- TABLEAU_PARENTS[code]: the two cards this card can be placed on in a board
+  column (one rank higher, opposite colour); empty for kings
+- KINGS: the codes of the four kings
+"""
+
+from config import SUITS, BOARD_COLUMNS, ACE, KING
+
+TALON_PILE = BOARD_COLUMNS
+FOUNDATION_PILE = BOARD_COLUMNS + 1
+NOT_DEALT = -1
+
+_RED_SUITS = ("H", "D")
+
+def _code(suit_index: int, rank: int) -> int:
+    return suit_index * 13 + rank - 1
+
+def _opposite_suits(suit_index: int) -> list:
+    red = SUITS[suit_index] in _RED_SUITS
+    return [i for i, suit in enumerate(SUITS) if (suit in _RED_SUITS) != red]
+
+TABLEAU_PARENTS = []
+for _suit in range(len(SUITS)):
+    for _rank in range(ACE, KING + 1):
+        _others = _opposite_suits(_suit)
+        TABLEAU_PARENTS.append(tuple(_code(s, _rank + 1) for s in _others) if _rank < KING else ())
+TABLEAU_PARENTS = tuple(TABLEAU_PARENTS)
+KINGS = tuple(_code(s, KING) for s in range(len(SUITS)))
+
+class CardLocations:
+    __slots__ = ("pile", "pos")
+
+    def __init__(self, game=None):
+        # two flat lists indexed by card code: pile number and position in it
+        self.pile = [NOT_DEALT] * 52
+        self.pos = [NOT_DEALT] * 52
+        if game is not None:
+            self.rebuild(game)
+
+    def rebuild(self, game):
+        """recount every pile of the game from scratch"""
+        for i, pile in enumerate(game.Board):
+            self.place(pile.cards, i)
+        self.place(game.talon.cards, TALON_PILE)
+        for i, suit in enumerate(SUITS):
+            self.place(game.foundations[suit].cards, FOUNDATION_PILE + i)
+
+    def place(self, cards, pile: int, start: int = 0):
+        # record that cards sit in pile from position start upwards
+        pile_of = self.pile
+        pos_of = self.pos
+        for pos, card in enumerate(cards, start):
+            code = card.code
+            pile_of[code] = pile
+            pos_of[code] = pos
+
+    def move(self, card, pile: int, pos: int):
+        code = card.code
+        self.pile[code] = pile
+        self.pos[code] = pos
+
+    def column_top(self, code: int, board) -> int:
+        """the column whose face-up top card is this card, or -1"""
+        pile = self.pile[code]
+        if pile < BOARD_COLUMNS:
+            column = board[pile]
+            pos = self.pos[code]
+            if pos == len(column.cards) - 1 and pos >= column.face_down:
+                return pile
+        return -1
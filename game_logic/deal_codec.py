@@ -0,0 +1,83 @@
+"""
+Reproducible deals for Solitaire.
+
+A deal is the order of the 52-card deck before it is dealt. Two ways of
+naming one are provided:
+- a deal number: a seed for a private random.Random, so the same number
+  always shuffles to the same deck (like numbered FreeCell deals)
+- a deal code: the exact deck order packed into an integer with a Lehmer
+  code (a permutation index below 52!) and written in base 62, which
+  restores any layout exactly, shuffled by us or not
+
+Cards are identified by the same 0..51 codes as GameState.
+"""
+
+import random
+from math import factorial
+from config import RANKS, SUITS
+from data_structures.cards import Card
+from .game_state import card_code, code_to_card
+
+DECK_SIZE = len(RANKS) * len(SUITS)
+DEAL_COUNT = factorial(DECK_SIZE)
+# largest deal number handed out for random games
+MAX_DEAL_NUMBER = 2 ** 32
+
+_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_DIGITS = {ch: i for i, ch in enumerate(_ALPHABET)}
+
+def new_deck() -> list[Card]:
+    # unshuffled deck in suit order, i.e. sorted by card code
+    return [Card(rank, suit) for suit in SUITS for rank in RANKS]
+
+def random_deal_number() -> int:
+    return random.randrange(MAX_DEAL_NUMBER)
+
+def shuffled_deck(deal_number: int) -> list[Card]:
+    """the deck for a deal number; independent of the global random state"""
+    deck = new_deck()
+    random.Random(deal_number).shuffle(deck)
+    return deck
+
+# ---------------- DECK <-> INTEGER ----------------
+def encode_deck(deck: list[Card]) -> int:
+    """index of the deck's permutation, 0 <= n < 52!"""
+    remaining = list(range(DECK_SIZE))
+    n = 0
+    for card in deck:
+        idx = remaining.index(card_code(card))
+        n = n * len(remaining) + idx
+        remaining.pop(idx)
+    if remaining:
+        raise ValueError(f"deck has {DECK_SIZE - len(remaining)} cards, expected {DECK_SIZE}")
+    return n
+
+def decode_deck(n: int) -> list[Card]:
+    if not 0 <= n < DEAL_COUNT:
+        raise ValueError(f"deal index out of range: {n}")
+    # peel off the mixed-radix digits, least significant (radix 1) first
+    digits = []
+    for radix in range(1, DECK_SIZE + 1):
+        n, digit = divmod(n, radix)
+        digits.append(digit)
+    remaining = list(range(DECK_SIZE))
+    return [code_to_card(remaining.pop(digit)) for digit in reversed(digits)]
+
+# ---------------- INTEGER <-> SHORT STRING ----------------
+def deck_to_code(deck: list[Card]) -> str:
+    n = encode_deck(deck)
+    chars = []
+    while True:
+        n, digit = divmod(n, len(_ALPHABET))
+        chars.append(_ALPHABET[digit])
+        if n == 0:
+            break
+    return "".join(reversed(chars))
+
+def deck_from_code(code: str) -> list[Card]:
+    n = 0
+    for ch in code.strip():
+        if ch not in _DIGITS:
+            raise ValueError(f"invalid character in deal code: {ch!r}")
+        n = n * len(_ALPHABET) + _DIGITS[ch]
+    return decode_deck(n)
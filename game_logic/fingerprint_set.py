@@ -0,0 +1,180 @@
+"""
+Memory-bounded visited set of 64-bit state fingerprints.
+
+A Python set of Zobrist keys costs around 60-70 bytes per state (an int
+object plus a hash table slot). FingerprintSet keeps the raw 64-bit keys
+in one array('Q') with open addressing and linear probing instead, about
+12-16 bytes per state at its load factor. Keys are already well mixed
+random numbers, so the low bits are used as the slot directly. 0 marks an
+empty slot; a key that happens to be 0 is stored as ZERO_KEY.
+
+An optional Bloom filter (bloom=True, one byte per slot, three bits per
+key) answers most "not seen yet" lookups before the table is probed.
+
+The table doubles when it gets two-thirds full. If doubling would take it
+past max_mb, add raises MemoryCapReached, a SearchAborted, so a search
+stops the same way it does when its time or node budget runs out.
+
+FingerprintMap is the same table with a 32-bit unsigned value next to each
+key, for searches that need more than "seen or not" (the solver keeps the
+cheapest move count per state in one).
+"""
+
+from array import array
+from config import GRAPH_MEMORY_MB, FINGERPRINT_BLOOM
+from .search_limits import SearchAborted
+
+ZERO_KEY = 0x9E3779B97F4A7C15
+MIN_CAPACITY = 1024
+
+class MemoryCapReached(SearchAborted):
+    """raised when a search would go over its memory cap"""
+
+class FingerprintSet:
+    def __init__(self, max_mb=GRAPH_MEMORY_MB, bloom=FINGERPRINT_BLOOM, capacity=MIN_CAPACITY):
+        self.max_bytes = None if max_mb is None else int(max_mb * 1024 * 1024)
+        self.use_bloom = bloom
+        self.size = 0
+        self._allocate(max(MIN_CAPACITY, 1 << (capacity - 1).bit_length()))
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.mask = capacity - 1
+        self.limit = capacity * 2 // 3
+        self.table = array("Q", bytes(8 * capacity))
+        # bloom filter bits, one byte per slot
+        self.bloom = bytearray(capacity) if self.use_bloom else None
+        self.bloom_mask = capacity * 8 - 1
+
+    def __len__(self):
+        return self.size
+
+    def _slot_bytes(self) -> int:
+        return 9 if self.use_bloom else 8
+
+    def nbytes(self) -> int:
+        return self.capacity * self._slot_bytes()
+
+    def _bloom_bits(self, key):
+        m = self.bloom_mask
+        return key & m, (key >> 21) & m, (key >> 42) & m
+
+    def __contains__(self, key) -> bool:
+        key = key or ZERO_KEY
+        if self.use_bloom:
+            bloom = self.bloom
+            for bit in self._bloom_bits(key):
+                if not bloom[bit >> 3] & (1 << (bit & 7)):
+                    return False
+        table, mask = self.table, self.mask
+        i = key & mask
+        while True:
+            slot = table[i]
+            if slot == key:
+                return True
+            if slot == 0:
+                return False
+            i = (i + 1) & mask
+
+    def add(self, key) -> bool:
+        """add a key; returns False if it was already there"""
+        key = key or ZERO_KEY
+        table, mask = self.table, self.mask
+        i = key & mask
+        if self.use_bloom:
+            bloom = self.bloom
+            fresh = False
+            for bit in self._bloom_bits(key):
+                byte, flag = bit >> 3, 1 << (bit & 7)
+                if not bloom[byte] & flag:
+                    fresh = True
+                    bloom[byte] |= flag
+            if fresh:
+                # certainly new: just find a free slot
+                while table[i]:
+                    i = (i + 1) & mask
+                table[i] = key
+                self._grown()
+                return True
+        while True:
+            slot = table[i]
+            if slot == key:
+                return False
+            if slot == 0:
+                table[i] = key
+                self._grown()
+                return True
+            i = (i + 1) & mask
+
+    def _grown(self):
+        self.size += 1
+        if self.size > self.limit:
+            self._resize(self.capacity * 2)
+
+    def _check_cap(self, capacity):
+        if self.max_bytes is not None and capacity * self._slot_bytes() > self.max_bytes:
+            raise MemoryCapReached()
+
+    def _resize(self, capacity):
+        self._check_cap(capacity)
+        old = self.table
+        self._allocate(capacity)
+        self.size = 0
+        for key in old:
+            if key:
+                self.add(key)
+
+    def clear(self):
+        self.size = 0
+        self._allocate(MIN_CAPACITY)
+
+class FingerprintMap(FingerprintSet):
+    def __init__(self, max_mb=GRAPH_MEMORY_MB, capacity=MIN_CAPACITY):
+        # lookups need the value anyway, so there is no Bloom filter
+        super().__init__(max_mb, False, capacity)
+
+    def _allocate(self, capacity):
+        super()._allocate(capacity)
+        self.values = array("I", bytes(4 * capacity))
+
+    def _slot_bytes(self) -> int:
+        return 12
+
+    def get(self, key, default=None):
+        """the value stored for key, or default"""
+        key = key or ZERO_KEY
+        table, mask = self.table, self.mask
+        i = key & mask
+        while True:
+            slot = table[i]
+            if slot == key:
+                return self.values[i]
+            if slot == 0:
+                return default
+            i = (i + 1) & mask
+
+    def put(self, key, value):
+        """store value for key, replacing the old one"""
+        key = key or ZERO_KEY
+        table, mask = self.table, self.mask
+        i = key & mask
+        while True:
+            slot = table[i]
+            if slot == key:
+                self.values[i] = value
+                return
+            if slot == 0:
+                table[i] = key
+                self.values[i] = value
+                self._grown()
+                return
+            i = (i + 1) & mask
+
+    def _resize(self, capacity):
+        self._check_cap(capacity)
+        old_keys, old_values = self.table, self.values
+        self._allocate(capacity)
+        self.size = 0
+        for key, value in zip(old_keys, old_values):
+            if key:
+                self.put(key, value)
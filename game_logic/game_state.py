@@ -0,0 +1,198 @@
+"""
+Compact immutable game state for the Solitaire AI.
+
+Packs a whole position into a single bytes object so search nodes are cheap
+to create, hash and keep around in large numbers (e.g. in a BFS frontier).
+Each card is a small int 0..51 (suit index * 13 + rank - 1), each foundation
+is stored as the rank of its top card, and face-down cards are tracked as a
+count per column since they always sit at the bottom of the pile.
+
+Layout of the packed bytes:
+- [0:4]    foundation top ranks, in SUITS order (0 = empty)
+- [4:11]   face-down count for each board column
+- [11:18]  length of each board column
+- [18]     stock length
+- [19]     waste length
+- [20]     times the stock has been recycled (only kept with MAX_RECYCLES)
+- [21:]    board columns (bottom to top), then stock, then waste
+
+Converts losslessly to and from the SolitaireGame object graph.
+"""
+
+from config import SUITS, BOARD_COLUMNS, KING, DRAW_COUNT, MAX_RECYCLES
+from data_structures.cards import Card
+from .talon import reachable_indices
+
+_FACE_DOWN = len(SUITS)
+_LENGTHS = _FACE_DOWN + BOARD_COLUMNS
+_STOCK_LEN = _LENGTHS + BOARD_COLUMNS
+_WASTE_LEN = _STOCK_LEN + 1
+_RECYCLES = _WASTE_LEN + 1
+_HEADER = _RECYCLES + 1
+
+_SUIT_INDEX = {suit: i for i, suit in enumerate(SUITS)}
+
+def card_code(card: Card) -> int:
+    # pack a card into 0..51
+    return card.code
+
+def code_rank(code: int) -> int:
+    return code % 13 + 1
+
+def code_suit(code: int) -> str:
+    return SUITS[code // 13]
+
+# the shared Card for every code
+_CARDS = tuple(Card(code % 13 + 1, SUITS[code // 13]) for code in range(52))
+
+def code_to_card(code: int) -> Card:
+    return _CARDS[code]
+
+class GameState:
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        object.__setattr__(self, "data", data)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GameState is immutable")
+
+    # ---------------- CONVERSION ----------------
+    @classmethod
+    def from_game(cls, game) -> "GameState":
+        foundations = bytes(game.foundations[suit].size() for suit in SUITS)
+        face_down = []
+        lengths = []
+        body = bytearray()
+        for pile in game.Board:
+            face_down.append(pile.face_down)
+            lengths.append(len(pile.cards))
+            body.extend(c.code for c in pile.cards)
+        body.extend(card_code(c) for c in game.stock.cards)
+        body.extend(card_code(c) for c in game.waste.cards)
+        # with unlimited recycles the count changes nothing, so equal
+        # positions stay equal however often the stock was turned over
+        recycles = game.recycles if MAX_RECYCLES is not None else 0
+        header = foundations + bytes(face_down) + bytes(lengths) + bytes((game.stock.size(), game.waste.size(), recycles))
+        return cls(header + bytes(body))
+
+    def to_game(self, game):
+        """overwrite the piles of an existing game with this state and return it"""
+        for i, suit in enumerate(SUITS):
+            pile = game.foundations[suit]
+            pile.cards = list(_CARDS[i * 13:i * 13 + self.data[i]])
+        for i, pile in enumerate(game.Board):
+            pile.set_cards([_CARDS[code] for code in self.column(i)], self.face_down(i))
+        waste = [_CARDS[code] for code in self.waste]
+        stock = [_CARDS[code] for code in reversed(self.stock)]
+        game.talon.set(waste + stock, len(waste))
+        game.recycles = self.recycles
+        game.locations.rebuild(game)
+        return game
+
+    # ---------------- ACCESSORS ----------------
+    def foundation_rank(self, suit: str) -> int:
+        return self.data[_SUIT_INDEX[suit]]
+
+    def face_down(self, col: int) -> int:
+        return self.data[_FACE_DOWN + col]
+
+    def _column_offset(self, col: int) -> int:
+        return _HEADER + sum(self.data[_LENGTHS:_LENGTHS + col])
+
+    def column(self, col: int) -> bytes:
+        start = self._column_offset(col)
+        return self.data[start:start + self.data[_LENGTHS + col]]
+
+    def _stock_offset(self) -> int:
+        return _HEADER + sum(self.data[_LENGTHS:_STOCK_LEN])
+
+    @property
+    def stock(self) -> bytes:
+        start = self._stock_offset()
+        return self.data[start:start + self.data[_STOCK_LEN]]
+
+    @property
+    def waste(self) -> bytes:
+        start = self._stock_offset() + self.data[_STOCK_LEN]
+        return self.data[start:start + self.data[_WASTE_LEN]]
+
+    @property
+    def recycles(self) -> int:
+        return self.data[_RECYCLES]
+
+    def is_won(self) -> bool:
+        return all(rank == KING for rank in self.data[:_FACE_DOWN])
+
+    # ---------------- CHILDREN ----------------
+    def _rebuild(self, foundations, face_down, columns, stock, waste, recycles) -> "GameState":
+        header = (bytes(foundations) + bytes(face_down) + bytes(len(c) for c in columns)
+                  + bytes((len(stock), len(waste), recycles)))
+        return GameState(header + b"".join(columns) + stock + waste)
+
+    def apply(self, move) -> "GameState":
+        """return the child state reached by a Move (the state itself is unchanged)"""
+        foundations = bytearray(self.data[:_FACE_DOWN])
+        face_down = bytearray(self.data[_FACE_DOWN:_LENGTHS])
+        columns = [self.column(i) for i in range(BOARD_COLUMNS)]
+        stock = self.stock
+        waste = self.waste
+        recycles = self.recycles
+        m = move
+        if m.move_type == "draw_stock":
+            drawn = min(DRAW_COUNT, len(stock))
+            if drawn:
+                waste = waste + stock[-drawn:][::-1]
+                stock = stock[:-drawn]
+        elif m.move_type == "reset_stock":
+            stock = stock + waste[::-1]
+            waste = b""
+            if MAX_RECYCLES is not None:
+                recycles += 1
+        elif m.move_type == "waste_to_foundation":
+            foundations[waste[-1] // 13] += 1
+            waste = waste[:-1]
+        elif m.move_type == "waste_to_Board":
+            col = m.dst
+            columns[col] = columns[col] + waste[-1:]
+            waste = waste[:-1]
+        elif m.move_type in ("talon_to_foundation", "talon_to_Board"):
+            # macro-move: the waste ends up holding the talon cards before the played one
+            talon = waste + stock[::-1]
+            can_reset = MAX_RECYCLES is None or recycles < MAX_RECYCLES
+            for index, _, recycled in reachable_indices(len(talon), len(waste), can_reset):
+                if index == m.start_idx and recycled and MAX_RECYCLES is not None:
+                    recycles += 1
+            card = talon[m.start_idx]
+            if m.move_type == "talon_to_foundation":
+                foundations[card // 13] += 1
+            else:
+                columns[m.dst] = columns[m.dst] + talon[m.start_idx:m.start_idx + 1]
+            waste = talon[:m.start_idx]
+            stock = talon[m.start_idx + 1:][::-1]
+        elif m.move_type in ("Board_to_foundation", "Board_to_Board"):
+            src = m.src
+            run = columns[src][m.start_idx:]
+            columns[src] = columns[src][:m.start_idx]
+            if m.move_type == "Board_to_foundation":
+                foundations[run[0] // 13] += 1
+            else:
+                dst = m.dst
+                columns[dst] = columns[dst] + run
+            # expose the new top card of the source column
+            if columns[src] and face_down[src] >= len(columns[src]):
+                face_down[src] = len(columns[src]) - 1
+        return self._rebuild(foundations, face_down, columns, stock, waste, recycles)
+
+    # ---------------- HASHING ----------------
+    def __eq__(self, other):
+        return isinstance(other, GameState) and self.data == other.data
+
+    def __hash__(self):
+        return hash(self.data)
+
+    def __reduce__(self):
+        return (GameState, (self.data,))
+
+    def __repr__(self):
+        return f"GameState({self.data.hex()})"
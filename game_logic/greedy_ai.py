@@ -3,7 +3,10 @@ Simple greedy AI for Solitaire - makes obvious best moves without deep search.
 This avoids getting stuck in cycles by always taking the best immediate action.
 """
 
-from game_logic.move_utils import Move
+from config import SUITS, BOARD_COLUMNS
+from game_logic.move_utils import make_move, board_targets, DRAW_STOCK, RESET_STOCK
+from game_logic.card_index import KINGS
+from game_logic.talon import can_recycle
 
 def get_greedy_move(game):
     """
@@ -19,75 +22,64 @@ def get_greedy_move(game):
     if game.waste.size() > 0:
         card = game.waste.peek()
         if game.foundations[card.suit].can_add(card):
-            return Move("waste_to_foundation", {"card": card})
+            return make_move("waste_to_foundation", dst=SUITS.index(card.suit))
     
     # Check tableau piles (top cards only)
     for i, pile in enumerate(game.Board):
         if pile.size() > 0:
             top_card = pile.peek()
-            if top_card.revealed and game.foundations[top_card.suit].can_add(top_card):
-                return Move("Board_to_foundation", {"from": i, "card": top_card, "start_idx": len(pile.cards) - 1})
+            if pile.face_down < pile.size() and game.foundations[top_card.suit].can_add(top_card):
+                return make_move("Board_to_foundation", i, SUITS.index(top_card.suit), len(pile.cards) - 1)
     
     # PRIORITY 2: Reveal hidden cards (very important for progress)
     # Move cards to empty piles to reveal underneath
     for i, pile in enumerate(game.Board):
-        if pile.size() > 0 and len(pile.cards) > 1:
-            # check if moving top card would reveal a hidden card
-            for j in range(len(pile.cards) - 1, -1, -1):
-                if not pile.cards[j].revealed:
-                    # found a hidden card - try to move cards above it
-                    if j < len(pile.cards) - 1:
-                        card_to_move = pile.cards[j + 1]
-                        if card_to_move.revealed:
-                            # try to move this card somewhere to reveal the hidden one
-                            for k, dst_pile in enumerate(game.Board):
-                                if k != i and dst_pile.can_add(card_to_move):
-                                    return Move("Board_to_Board", {
-                                        "from": i, "to": k, "card": card_to_move, "start_idx": j + 1
-                                    })
-                    break
+        # the face-up card right above the highest hidden card
+        if 0 < pile.face_down < pile.size():
+            card_to_move = pile.cards[pile.face_down]
+            # try to move it (and what is on it) somewhere to reveal the hidden one
+            for k in board_targets(game, card_to_move):
+                if k != i:
+                    return make_move("Board_to_Board", i, k, pile.face_down)
     
     # PRIORITY 3: Move from waste to tableau (better than just sitting in waste)
     if game.waste.size() > 0:
-        card = game.waste.peek()
-        for i, pile in enumerate(game.Board):
-            if pile.can_add(card):
-                return Move("waste_to_Board", {"column": i, "card": card})
+        targets = board_targets(game, game.waste.peek())
+        if targets:
+            return make_move("waste_to_Board", dst=targets[0])
     
     # PRIORITY 4: Build sequences in tableau (move kings to empty piles)
     for i, pile in enumerate(game.Board):
         if pile.size() == 0:
-            # found empty pile - look for a king to move there
-            for j, src_pile in enumerate(game.Board):
-                if j != i and src_pile.size() > 0:
-                    # find the first revealed king
-                    for idx in range(len(src_pile.cards)):
-                        card = src_pile.cards[idx]
-                        if card.revealed and card.rank == 13 and idx > 0:
-                            # found a king that's not at the bottom - move it
-                            return Move("Board_to_Board", {
-                                "from": j, "to": i, "card": card, "start_idx": idx
-                            })
+            # found empty pile - look up the four kings for a revealed one
+            # that's not at the bottom of its column
+            locations = game.locations
+            best = None
+            for king in KINGS:
+                j = locations.pile[king]
+                idx = locations.pos[king]
+                if j < BOARD_COLUMNS and idx >= max(game.Board[j].face_down, 1):
+                    if best is None or (j, idx) < best:
+                        best = (j, idx)
+            if best is not None:
+                return make_move("Board_to_Board", best[0], i, best[1])
     
     # PRIORITY 5: Make any valid tableau move to try new configurations
     for i, src_pile in enumerate(game.Board):
         if src_pile.size() > 0:
-            for start_idx in range(len(src_pile.cards) - 1, -1, -1):
+            for start_idx in range(len(src_pile.cards) - 1, src_pile.face_down - 1, -1):
                 card = src_pile.cards[start_idx]
-                if card.revealed:
-                    for j, dst_pile in enumerate(game.Board):
-                        if i != j and dst_pile.can_add(card):
-                            return Move("Board_to_Board", {
-                                "from": i, "to": j, "card": card, "start_idx": start_idx
-                            })
+                for j in board_targets(game, card):
+                    if i != j:
+                        return make_move("Board_to_Board", i, j, start_idx)
     
     # PRIORITY 6: Draw from stock (last resort)
     if game.stock.size() > 0:
-        return Move("draw_stock", {})
+        return DRAW_STOCK
     
-    # PRIORITY 7: Reset stock if needed
-    if game.waste.size() > 0:
-        return Move("reset_stock", {})
+    # PRIORITY 7: Reset stock if needed (and still allowed)
+    if game.waste.size() > 0 and can_recycle(game):
+        return RESET_STOCK
     
     # No moves available
     return None
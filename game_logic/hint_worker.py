@@ -0,0 +1,108 @@
+"""
+Background search thread for the hint and auto-move buttons.
+
+The pygame loop hands a search function to HintWorker.submit together with
+the current game. The worker copies the position into a GameState snapshot
+and runs the search on its own scratch game in a daemon thread, so the loop
+keeps drawing frames and the live game is never touched by the search.
+
+Finished results go into a queue that the loop drains with poll() once per
+frame. poll() also compares the board with the snapshot: as soon as the
+player changes the board the running search is cancelled (through its
+cancel event, see SearchLimits) and its result is thrown away. Submitting a
+new search cancels the previous one too, so only one result is ever wanted.
+A search that fails with an exception is reported as an empty (None) result
+and the worker carries on with the next job.
+"""
+
+import queue
+import threading
+from .game_state import GameState
+from .solitaire_game import SolitaireGame
+from .search_limits import SearchAborted
+
+class HintJob:
+    __slots__ = ("kind", "search", "snapshot", "params", "cancel")
+
+    def __init__(self, kind, search, snapshot, params):
+        self.kind = kind
+        self.search = search
+        self.snapshot = snapshot
+        self.params = params
+        self.cancel = threading.Event()
+
+class HintWorker:
+    def __init__(self):
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        # the job whose result is still wanted, None when idle
+        self.current = None
+        self.thread = threading.Thread(target=self._run, name="hint-worker", daemon=True)
+        self.thread.start()
+
+    @property
+    def busy(self) -> bool:
+        return self.current is not None
+
+    def submit(self, kind, search, game, **params):
+        """
+        Start search(scratch_game, cancel=event, **params) on a snapshot of
+        game. kind is handed back with the result so the caller knows what
+        it asked for.
+        """
+        self.cancel()
+        job = HintJob(kind, search, GameState.from_game(game), params)
+        self.current = job
+        self.requests.put(job)
+
+    def cancel(self):
+        if self.current is not None:
+            self.current.cancel.set()
+            self.current = None
+
+    def poll(self, game):
+        """return (kind, result) once the current search is done, else None"""
+        if self.current is not None and GameState.from_game(game) != self.current.snapshot:
+            # the board changed under the search, its answer is useless now
+            self.cancel()
+        while True:
+            try:
+                job, result = self.results.get_nowait()
+            except queue.Empty:
+                return None
+            if job is self.current:
+                self.current = None
+                return job.kind, result
+
+    def stop(self):
+        self.cancel()
+        self.requests.put(None)
+
+    # ---------------- WORKER THREAD ----------------
+    def _run(self):
+        game = None
+        while True:
+            job = self.requests.get()
+            if job is None:
+                return
+            if job.cancel.is_set():
+                continue
+            if game is None:
+                # scratch game reused for every job; to_game overwrites its piles
+                game = SolitaireGame()
+            job.snapshot.to_game(game)
+            result = None
+            try:
+                result = job.search(game, cancel=job.cancel, **job.params)
+            except SearchAborted:
+                pass
+            except Exception as error:
+                # a broken search must not take the thread down with it;
+                # the job still ends, with an empty result
+                print(f"{job.kind} search failed: {error!r}")
+                game = None
+            finally:
+                # every job that is still wanted gets an answer, so poll
+                # always clears busy
+                if not job.cancel.is_set():
+                    self.results.put((job, result))
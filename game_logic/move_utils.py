@@ -1,134 +1,456 @@
 """
 Shared utilities for AI move generation in Solitaire.
 
-Provides common functionality used by both tree-based and graph-based search:
-- Move representation and state management
+Provides common functionality used by the tree, graph and greedy AIs and the UI:
+- Move representation: a small tuple (type, src, dst, start index) with a
+  packed integer form, interned so generating moves allocates almost nothing
+- The single legal move generator and legality check, optionally with
+  stock/waste macro-moves for the searches (see talon.py)
 - Game state serialization for memoization
-- Heuristic scoring for move prioritization
-- Move application with deep copying
+- Heuristic scoring for move prioritization (see score_tracker.py for the
+  incremental version used inside searches)
+- In-place move application with undo (make/unmake) for search, keeping
+  the card location index (card_index.py) up to date
+- Human-readable move descriptions, built only when displayed
 """
 
-import copy
-from config import FOUNDATION_CARD_POINTS, REVEALED_CARD_POINTS, EMPTY_PILE_POINTS
+from collections import namedtuple
+from config import FOUNDATION_CARD_POINTS, REVEALED_CARD_POINTS, EMPTY_PILE_POINTS, SUITS, BOARD_COLUMNS, KING, STOCK_MACRO_MOVES, DRAW_COUNT, MAX_RECYCLES
+from .card_index import TABLEAU_PARENTS, TALON_PILE, FOUNDATION_PILE
+from .talon import (MAX_TALON_LENGTH, can_recycle, talon_card, talon_route, reachable_talon_cards,
+                    take_talon_card, put_talon_card)
 
-class Move:
-    def __init__(self, move_type: str, details: dict):
-        self.move_type = move_type
-        self.details = details
+# ---------------- MOVES ----------------
+# src/dst are column indices; for foundation moves dst is the index of the
+# foundation (suit) in SUITS order; unused fields are -1. start_idx is the
+# index in the source column of the first card moved, or for the talon_*
+# macro-moves the index of the card in the talon (see talon.py).
+class Move(namedtuple("Move", ["move_type", "src", "dst", "start_idx"])):
+    __slots__ = ()
 
-    def __repr__(self):
-        card = self.details.get("card")
-        card_str = repr(card) if card else None
-        details_copy = self.details.copy()
-        if card:
-            details_copy["card"] = card_str
-        return f"Move({self.move_type}, {details_copy})"
+MOVE_TYPES = ["draw_stock", "reset_stock", "waste_to_foundation", "waste_to_Board", "Board_to_foundation", "Board_to_Board",
+              "talon_to_foundation", "talon_to_Board"]
+TALON_MOVE_TYPES = ("talon_to_foundation", "talon_to_Board")
+# foundation moves that play a card straight away; a talon_to_foundation
+# macro-move draws through the stock first, so the searches treat it like
+# any other move instead of taking it unsearched
+FOUNDATION_MOVE_TYPES = ("waste_to_foundation", "Board_to_foundation")
+_TYPE_INDEX = {t: i for i, t in enumerate(MOVE_TYPES)}
+
+# longest possible column: six face-down cards under a full K..A run
+MAX_COLUMN_LENGTH = BOARD_COLUMNS - 1 + KING
+
+def encode_move(move: Move) -> int:
+    """pack a move into a small int (fits in 14 bits)"""
+    return ((_TYPE_INDEX[move.move_type] * 8 + move.src + 1) * 8 + move.dst + 1) * 32 + move.start_idx + 1
+
+def decode_move(code: int) -> Move:
+    code, start_idx = divmod(code, 32)
+    code, dst = divmod(code, 8)
+    type_index, src = divmod(code, 8)
+    return make_move(MOVE_TYPES[type_index], src - 1, dst - 1, start_idx - 1)
+
+# every move that can occur is built once here and shared afterwards
+DRAW_STOCK = Move("draw_stock", -1, -1, -1)
+RESET_STOCK = Move("reset_stock", -1, -1, -1)
+_WASTE_TO_FOUNDATION = [Move("waste_to_foundation", -1, f, -1) for f in range(len(SUITS))]
+_WASTE_TO_BOARD = [Move("waste_to_Board", -1, col, -1) for col in range(BOARD_COLUMNS)]
+_BOARD_TO_FOUNDATION = [[[Move("Board_to_foundation", src, f, start) for f in range(len(SUITS))]
+                         for start in range(MAX_COLUMN_LENGTH)] for src in range(BOARD_COLUMNS)]
+_BOARD_TO_BOARD = [[[Move("Board_to_Board", src, dst, start) for start in range(MAX_COLUMN_LENGTH)]
+                    for dst in range(BOARD_COLUMNS)] for src in range(BOARD_COLUMNS)]
+_TALON_TO_FOUNDATION = [[Move("talon_to_foundation", -1, f, index) for f in range(len(SUITS))]
+                        for index in range(MAX_TALON_LENGTH)]
+_TALON_TO_BOARD = [[Move("talon_to_Board", -1, col, index) for col in range(BOARD_COLUMNS)]
+                   for index in range(MAX_TALON_LENGTH)]
+
+def make_move(move_type: str, src: int = -1, dst: int = -1, start_idx: int = -1) -> Move:
+    """return the shared Move instance for these fields"""
+    if move_type == "draw_stock":
+        return DRAW_STOCK
+    if move_type == "reset_stock":
+        return RESET_STOCK
+    if move_type == "waste_to_foundation":
+        return _WASTE_TO_FOUNDATION[dst]
+    if move_type == "waste_to_Board":
+        return _WASTE_TO_BOARD[dst]
+    if move_type == "Board_to_foundation":
+        return _BOARD_TO_FOUNDATION[src][start_idx][dst]
+    if move_type == "talon_to_foundation":
+        return _TALON_TO_FOUNDATION[start_idx][dst]
+    if move_type == "talon_to_Board":
+        return _TALON_TO_BOARD[start_idx][dst]
+    return _BOARD_TO_BOARD[src][dst][start_idx]
+
+# ---------------- LEGAL MOVES ----------------
+def board_targets(game, card) -> list:
+    """
+    columns a card can be placed on, in column order: the empty columns for
+    a king, otherwise the columns topped by one of its two tableau parents
+    (looked up in the location index instead of trying every column)
+    """
+    board = game.Board
+    if card.rank == KING:
+        return [j for j, pile in enumerate(board) if not pile.cards]
+    column_top = game.locations.column_top
+    a, b = TABLEAU_PARENTS[card.code]
+    ja = column_top(a, board)
+    jb = column_top(b, board)
+    if ja < 0:
+        return [jb] if jb >= 0 else []
+    if jb < 0:
+        return [ja]
+    return [ja, jb] if ja < jb else [jb, ja]
+
+def get_legal_moves(game, talon_macros=False):
+    """
+    every legal move, in a fixed order. With talon_macros the stock is
+    played through macro-moves instead: one per place a buried talon card
+    can go, cheapest first, and no plain draw or reset moves.
+    """
+    moves = []
+    append = moves.append
+    board = game.Board
+    if game.waste.size() > 0:
+        card = game.waste.peek()
+        if game.foundations[card.suit].can_add(card):
+            append(_WASTE_TO_FOUNDATION[card.suit_index])
+        for i in board_targets(game, card):
+            append(_WASTE_TO_BOARD[i])
+    for i, pile in enumerate(board):
+        top = len(pile.cards) - 1
+        # every card of the face-up run on top can lead a move
+        for start_idx in range(pile.top_run_start(), top + 1):
+            card = pile.cards[start_idx]
+            # can move to foundation (only if it's the top card)
+            if start_idx == top and game.foundations[card.suit].can_add(card):
+                append(_BOARD_TO_FOUNDATION[i][start_idx][card.suit_index])
+            # can move sequence to another Board pile (including empty piles)
+            targets = _BOARD_TO_BOARD[i]
+            for j in board_targets(game, card):
+                if i != j:
+                    append(targets[j][start_idx])
+    if talon_macros:
+        for index, _, _ in reachable_talon_cards(game):
+            card = talon_card(game, index)
+            if game.foundations[card.suit].can_add(card):
+                append(_TALON_TO_FOUNDATION[index][card.suit_index])
+            for j in board_targets(game, card):
+                append(_TALON_TO_BOARD[index][j])
+    elif game.stock.size() > 0:
+        append(DRAW_STOCK)
+    elif game.waste.size() > 0 and can_recycle(game):
+        append(RESET_STOCK)
+    return moves
+
+def get_search_moves(game):
+    """the moves the tree and graph searches expand (macro-moves with STOCK_MACRO_MOVES)"""
+    return get_legal_moves(game, STOCK_MACRO_MOVES)
+
+def is_legal_move(game, move) -> bool:
+    t = move.move_type
+    if t == "draw_stock":
+        return game.stock.size() > 0
+    if t == "reset_stock":
+        return game.stock.size() == 0 and game.waste.size() > 0 and can_recycle(game)
+    if t in ("waste_to_foundation", "waste_to_Board", "talon_to_foundation", "talon_to_Board"):
+        if t in TALON_MOVE_TYPES:
+            # any talon card the draws can bring up, except the waste top
+            # (the waste moves play that one)
+            if talon_route(game, move.start_idx) is None:
+                return False
+            card = talon_card(game, move.start_idx)
+        else:
+            card = game.waste.peek()
+        if card is None:
+            return False
+        if t in ("waste_to_foundation", "talon_to_foundation"):
+            return SUITS[move.dst] == card.suit and game.foundations[card.suit].can_add(card)
+        return 0 <= move.dst < len(game.Board) and game.Board[move.dst].can_add(card)
+    if not 0 <= move.src < len(game.Board):
+        return False
+    pile = game.Board[move.src]
+    if not pile.top_run_start() <= move.start_idx < len(pile.cards):
+        return False
+    card = pile.cards[move.start_idx]
+    if t == "Board_to_foundation":
+        return (move.start_idx == len(pile.cards) - 1 and SUITS[move.dst] == card.suit
+                and game.foundations[card.suit].can_add(card))
+    return 0 <= move.dst < len(game.Board) and move.src != move.dst and game.Board[move.dst].can_add(card)
+
+def moving_card(game, move):
+    """the card a move picks up (the lowest one for a run), or None"""
+    if move.move_type in ("waste_to_foundation", "waste_to_Board"):
+        return game.waste.peek()
+    if move.move_type in TALON_MOVE_TYPES:
+        if move.start_idx < game.talon.size():
+            return talon_card(game, move.start_idx)
+        return None
+    if move.move_type in ("Board_to_foundation", "Board_to_Board"):
+        cards = game.Board[move.src].cards
+        return cards[move.start_idx] if move.start_idx < len(cards) else None
+    return None
 
 def serialize_state(game):
     board_ser = []
     for pile in game.Board:
-        pile_ser = tuple((c.rank, c.suit, c.revealed) for c in pile.cards)
+        pile_ser = tuple((c.rank, c.suit, j >= pile.face_down) for j, c in enumerate(pile.cards))
         board_ser.append(pile_ser)
     board_ser_sorted = tuple(sorted(board_ser, key=lambda x: x[-1] if x else (0, 'X', False)))
     foundation_ser = tuple(tuple((c.rank, c.suit) for c in game.foundations[suit].cards) for suit in ["H","D","C","S"])
     stock_ser = tuple((c.rank, c.suit) for c in game.stock.cards)
     waste_ser = tuple((c.rank, c.suit) for c in game.waste.cards)
-    return (board_ser_sorted, foundation_ser, stock_ser, waste_ser)
+    # recycles only matter while they are limited
+    recycles = game.recycles if MAX_RECYCLES is not None else None
+    return (board_ser_sorted, foundation_ser, stock_ser, waste_ser, recycles)
 
-def score_state(game):
-    score = 0
-    
-    # cards in foundation (MASSIVELY highest priority)
-    total_foundation = 0
-    for suit in ["H","D","C","S"]:
+def score_components(game) -> tuple:
+    """
+    the counts score_state is built from, by a full scan of the game:
+    (foundation total, sum of squared foundation sizes, revealed board
+    cards, empty columns, columns with a king under other cards, stock
+    size, waste size). ScoreTracker keeps the same tuple up to date
+    incrementally during a search.
+    """
+    foundation_total = 0
+    foundation_squares = 0
+    for suit in SUITS:
         foundation_size = len(game.foundations[suit].cards)
-        total_foundation += foundation_size
-        # exponential reward for foundation cards
-        score += FOUNDATION_CARD_POINTS * foundation_size * 3
-        score += foundation_size * foundation_size * 2
-    
+        foundation_total += foundation_size
+        foundation_squares += foundation_size * foundation_size
+    revealed = 0
+    empty_count = 0
+    king_columns = 0
+    for pile in game.Board:
+        revealed += len(pile.cards) - pile.face_down
+        if pile.size() == 0:
+            empty_count += 1
+        elif pile.cards[0].rank == KING and len(pile.cards) > 1:
+            king_columns += 1
+    return (foundation_total, foundation_squares, revealed, empty_count, king_columns,
+            game.stock.size(), game.waste.size())
+
+def score_from_components(foundation_total, foundation_squares, revealed, empty_count, king_columns, stock, waste):
+    # cards in foundation (MASSIVELY highest priority), with an
+    # exponential reward for each foundation's size
+    score = FOUNDATION_CARD_POINTS * 3 * foundation_total + 2 * foundation_squares
+
     # huge bonus for getting closer to winning
-    if total_foundation > 40:
+    if foundation_total > 40:
         score += 500
-    elif total_foundation > 30:
+    elif foundation_total > 30:
         score += 200
-    elif total_foundation > 20:
+    elif foundation_total > 20:
         score += 100
-    
+
     # revealed cards (minor)
-    for pile in game.Board:
-        for card in pile.cards:
-            if card.revealed:
-                score += REVEALED_CARD_POINTS * 0.5
-    
+    score += REVEALED_CARD_POINTS * 0.5 * revealed
+
     # empty piles (but only if we have kings to put there)
-    empty_count = 0
-    has_king_to_move = False
-    for pile in game.Board:
-        if pile.size() == 0:
-            empty_count += 1
-        elif pile.size() > 0 and pile.cards[0].rank == 13 and len(pile.cards) > 1:
-            has_king_to_move = True
-    
-    if has_king_to_move:
+    if king_columns:
         score += EMPTY_PILE_POINTS * empty_count * 3
     else:
         score += EMPTY_PILE_POINTS * empty_count
-    
+
     # bonus for longer revealed sequences (helps build plays)
-    for pile in game.Board:
-        sequence_length = 0
-        for i in range(len(pile.cards)):
-            if pile.cards[i].revealed:
-                sequence_length += 1
-        score += sequence_length * 0.3
-    
+    score += revealed * 0.3
+
     # penalty for having many cards in stock/waste (want to clear them)
-    score -= game.stock.size() * 0.5
-    score -= game.waste.size() * 1.0
-    
+    score -= stock * 0.5
+    score -= waste * 1.0
+
     return score
 
-def apply_move(game, move):
-    g = copy.deepcopy(game)
+def score_state(game):
+    return score_from_components(*score_components(game))
+
+def _shift_talon(game, start):
+    # a card left or came back at talon index start (the waste top), so the
+    # cards from there on have new talon positions
+    game.locations.place(game.talon.cards[start:], TALON_PILE, start)
+
+def do_move(game, move):
+    """
+    Apply a move to the game in place and return the undo record.
+
+    The record holds only what changed: how many cards were moved (or drawn /
+    recycled) and whether a face-down card was flipped to expose it. For
+    the talon macro-moves it is the waste size before the move and whether
+    the stock was recycled on the way instead. Pass it back to undo_move to
+    restore the exact previous state.
+    """
+    m = move
+    locations = game.locations
+    if m.move_type == "draw_stock":
+        # DRAW_COUNT cards (fewer at the end of the stock); only the talon
+        # cursor moves, so no card changes its location
+        return (game.talon.draw(DRAW_COUNT), False)
+    if m.move_type == "reset_stock":
+        game.recycles += 1
+        return (game.talon.recycle(), False)
+    if m.move_type == "waste_to_foundation":
+        card = game.waste.pop()
+        _shift_talon(game, game.talon.cursor)
+        foundation = game.foundations[card.suit]
+        foundation.add(card)
+        locations.move(card, FOUNDATION_PILE + card.suit_index, foundation.size() - 1)
+        return (1, False)
+    if m.move_type == "waste_to_Board":
+        card = game.waste.pop()
+        _shift_talon(game, game.talon.cursor)
+        game.Board[m.dst].add(card)
+        locations.move(card, m.dst, game.Board[m.dst].size() - 1)
+        return (1, False)
+    if m.move_type == "Board_to_foundation":
+        pile = game.Board[m.src]
+        if m.start_idx != len(pile.cards) - 1:
+            return (0, False)
+        card = pile.pop()
+        foundation = game.foundations[card.suit]
+        foundation.add(card)
+        locations.move(card, FOUNDATION_PILE + card.suit_index, foundation.size() - 1)
+        return (1, pile.reveal_top_card())
+    if m.move_type == "Board_to_Board":
+        src = game.Board[m.src]
+        dst = game.Board[m.dst]
+        sequence = src.take_run(m.start_idx)
+        locations.place(sequence, m.dst, dst.size())
+        dst.put_run(sequence)
+        return (len(sequence), src.reveal_top_card())
+    if m.move_type in ("talon_to_foundation", "talon_to_Board"):
+        _, recycled = talon_route(game, m.start_idx)
+        card, waste_size = take_talon_card(game, m.start_idx)
+        game.recycles += recycled
+        if m.move_type == "talon_to_foundation":
+            foundation = game.foundations[card.suit]
+            foundation.add(card)
+            locations.move(card, FOUNDATION_PILE + m.dst, foundation.size() - 1)
+        else:
+            game.Board[m.dst].add(card)
+            locations.move(card, m.dst, game.Board[m.dst].size() - 1)
+        return (waste_size, recycled)
+    return (0, False)
+
+def undo_move(game, move, undo):
+    """Reverse a move applied by do_move, using the record it returned."""
+    moved, flipped = undo
     m = move
+    locations = game.locations
     if m.move_type == "draw_stock":
-        drawn = g.stock.draw()
-        if drawn:
-            drawn.revealed = True
-            g.waste.add(drawn)
-        return g
+        game.talon.cursor -= moved
+        return
     if m.move_type == "reset_stock":
-        g.stock.recycle_from(g.waste)
-        return g
+        game.talon.cursor = moved
+        game.recycles -= 1
+        return
     if m.move_type == "waste_to_foundation":
-        card = g.waste.pop()
-        g.foundations[card.suit].add(card)
-        return g
+        game.waste.add(game.foundations[SUITS[m.dst]].pop())
+        _shift_talon(game, game.talon.cursor - 1)
+        return
     if m.move_type == "waste_to_Board":
-        card = g.waste.pop()
-        g.Board[m.details["column"]].add(card)
-        return g
+        game.waste.add(game.Board[m.dst].pop())
+        _shift_talon(game, game.talon.cursor - 1)
+        return
     if m.move_type == "Board_to_foundation":
-        col = m.details["from"]
-        start_idx = m.details.get("start_idx", len(g.Board[col].cards) - 1)
-        if start_idx == len(g.Board[col].cards) - 1:
-            card = g.Board[col].pop()
-            g.foundations[card.suit].add(card)
-            if g.Board[col].size() > 0:
-                g.Board[col].cards[-1].revealed = True
-        return g
+        if moved:
+            pile = game.Board[m.src]
+            if flipped:
+                pile.hide_top_card()
+            card = game.foundations[SUITS[m.dst]].pop()
+            pile.push(card)
+            locations.move(card, m.src, pile.size() - 1)
+        return
     if m.move_type == "Board_to_Board":
-        src = m.details["from"]
-        dst = m.details["to"]
-        start_idx = m.details.get("start_idx", len(g.Board[src].cards) - 1)
-        sequence = g.Board[src].cards[start_idx:]
-        del g.Board[src].cards[start_idx:]
-        for c in sequence:
-            c.revealed = True
-            g.Board[dst].add(c)
-        if g.Board[src].size() > 0:
-            g.Board[src].cards[-1].revealed = True
-        return g
-    return g
+        src = game.Board[m.src]
+        dst = game.Board[m.dst]
+        if moved:
+            sequence = dst.take_run(dst.size() - moved)
+            if flipped:
+                src.hide_top_card()
+            locations.place(sequence, m.src, src.size())
+            src.put_run(sequence)
+        return
+    if m.move_type == "talon_to_foundation":
+        put_talon_card(game, m.start_idx, game.foundations[SUITS[m.dst]].pop(), moved)
+        game.recycles -= flipped
+        return
+    if m.move_type == "talon_to_Board":
+        put_talon_card(game, m.start_idx, game.Board[m.dst].pop(), moved)
+        game.recycles -= flipped
+        return
+
+def move_cost(game, move) -> int:
+    """how many single moves a move stands for: the draws and resets of a macro-move plus the play itself"""
+    if move.move_type in TALON_MOVE_TYPES:
+        cost, _ = talon_route(game, move.start_idx)
+        return cost + 1
+    return 1
+
+def cheapest_moves(game, moves) -> list:
+    """the moves with the lowest move_cost, so ties never pick a longer chain of draws"""
+    costs = [move_cost(game, move) for move in moves]
+    least = min(costs, default=0)
+    return [move for move, cost in zip(moves, costs) if cost == least]
+
+def expand_move(game, move) -> list:
+    """
+    the single moves a move stands for, to be applied in order starting
+    from the current state: a talon macro-move becomes its draws (and
+    reset) followed by the plain waste move; any other move is returned as is
+    """
+    if move.move_type not in TALON_MOVE_TYPES:
+        return [move]
+    cost, recycled = talon_route(game, move.start_idx)
+    steps = []
+    if recycled:
+        # finish this pass, turn the waste over, then draw up to the card
+        draws = -(-game.stock.size() // DRAW_COUNT)
+        steps += [DRAW_STOCK] * draws
+        steps.append(RESET_STOCK)
+        cost -= draws + 1
+    steps += [DRAW_STOCK] * cost
+    if move.move_type == "talon_to_foundation":
+        steps.append(_WASTE_TO_FOUNDATION[move.dst])
+    else:
+        steps.append(_WASTE_TO_BOARD[move.dst])
+    return steps
+
+# ---------------- HUMAN-READABLE MOVE ----------------
+def describe_move(move, game=None):
+    """
+    text for the UI; pass the game (before the move is made) to name the
+    card being moved
+    """
+    if not move:
+        return "No move found"
+    card = moving_card(game, move) if game is not None else None
+    card_str = f"{card} " if card else ""
+    if move.move_type in TALON_MOVE_TYPES:
+        draws = "Draw from the stock"
+        if game is not None:
+            cost, recycled = talon_route(game, move.start_idx)
+            draws = f"Draw {cost - recycled}x from the stock" + (" (turning it over once)" if recycled else "")
+        if move.move_type == "talon_to_Board":
+            return f"{draws}, then move {card_str}from waste to column {move.dst}"
+        return f"{draws}, then move {card_str}from waste to the foundation"
+    if move.move_type == "Board_to_Board":
+        return f"Move {card_str}from column {move.src} to column {move.dst}"
+    if move.move_type == "Board_to_foundation":
+        return f"Move {card_str}from column {move.src} to the foundation"
+    if move.move_type == "waste_to_Board":
+        return f"Move {card_str}from waste to column {move.dst}"
+    if move.move_type == "waste_to_foundation":
+        return f"Move {card_str}from waste to the foundation"
+    if move.move_type == "draw_stock":
+        return "Draw a card from the stock" if DRAW_COUNT == 1 else f"Draw {DRAW_COUNT} cards from the stock"
+    if move.move_type == "reset_stock":
+        return "Reset the stock"
+    return f"Move: {move}"
 
+def history_entry(move) -> dict:
+    """the record kept in the auto-play move history for cycle detection"""
+    return {
+        "type": move.move_type,
+        "from": move.src if move.move_type in ("Board_to_foundation", "Board_to_Board") else None,
+        "to": move.dst if move.move_type == "Board_to_Board" else None,
+    }
@@ -0,0 +1,182 @@
+"""
+Root-parallel tree search for Solitaire over a process pool.
+
+The subtrees below the root moves are independent, so each one (or, with
+split_depth=2, each subtree below a root move's replies) is sent to a
+concurrent.futures process pool as a compact GameState byte string and
+searched there with the ordinary search_best_move. The parent merges the
+returned scores in root-move order, so the chosen move does not depend on
+which worker finishes first: ties go to the earlier move (after the serial
+search's preference for non-stock moves).
+
+Workers keep their own transposition table between tasks. The Zobrist keys
+of the path to each subtree are sent along so cycles back to the root are
+still detected.
+
+A cancel event (anything with is_set()) stops the search: queued subtrees
+are cancelled and SearchAborted is raised. Subtrees already running get a
+shared event from a multiprocessing manager, which the parent sets on
+cancel; the workers check it through SearchLimits and give up within a few
+hundred nodes, so the pool is free for the next search.
+"""
+
+from config import SEARCH_WORKERS
+from .move_utils import score_state, do_move, undo_move, cheapest_moves, FOUNDATION_MOVE_TYPES
+from .game_state import GameState
+from .solitaire_game import SolitaireGame
+from .zobrist import zobrist_key
+from .transposition import TranspositionTable
+from .search_limits import SearchLimits, SearchAborted
+from .best_move_tree import get_search_moves, search_best_move, filter_recent_moves, move_priority
+
+FOUNDATION_BONUS = 1000.0
+# how often the parent checks the cancel event while waiting on workers
+POLL_INTERVAL = 0.05
+# nodes a worker searches between looks at the shared cancel event (each
+# look is a round trip to the manager process)
+CANCEL_CHECK_NODES = 256
+
+_executor = None
+_executor_workers = None
+_manager = None
+
+def get_executor(workers=None):
+    """return the shared process pool, (re)creating it for a new worker count"""
+    global _executor, _executor_workers
+    workers = workers or SEARCH_WORKERS
+    if _executor is None or _executor_workers != workers:
+        # imported here: concurrent.futures costs more to import than the
+        # whole game core, and the workers themselves never need it
+        from concurrent.futures import ProcessPoolExecutor
+        shutdown_executor()
+        _executor = ProcessPoolExecutor(max_workers=workers)
+        _executor_workers = workers
+    return _executor
+
+def shutdown_executor():
+    global _executor, _executor_workers, _manager
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    if _manager is not None:
+        _manager.shutdown()
+    _executor = None
+    _executor_workers = None
+    _manager = None
+
+def shared_event():
+    """a new event the pool workers can see, from the shared manager"""
+    global _manager
+    if _manager is None:
+        from multiprocessing import Manager
+        _manager = Manager()
+    return _manager.Event()
+
+# ---------------- WORKER SIDE ----------------
+_worker_game = None
+_worker_table = None
+
+class _PolledEvent:
+    # looks at the shared event only every CANCEL_CHECK_NODES-th is_set()
+    def __init__(self, event):
+        self.event = event
+        self.calls = 0
+
+    def is_set(self) -> bool:
+        self.calls += 1
+        return self.calls % CANCEL_CHECK_NODES == 0 and self.event.is_set()
+
+def _search_subtree(data, depth, path_keys, cancel=None):
+    """
+    search one subtree in a worker process and return its score; raises
+    SearchAborted once the shared cancel event is set
+    """
+    global _worker_game, _worker_table
+    if _worker_game is None:
+        # scratch game reused for every task; to_game overwrites its piles
+        _worker_game = SolitaireGame()
+        _worker_table = TranspositionTable(max_mb=16)
+    game = GameState(data).to_game(_worker_game)
+    limits = SearchLimits(cancel=_PolledEvent(cancel)) if cancel is not None else None
+    score, _ = search_best_move(game, depth, visited={key: ply for ply, key in enumerate(path_keys)}, table=_worker_table,
+                                ply=len(path_keys), limits=limits)
+    return score
+
+# ---------------- PARENT SIDE ----------------
+def _bonus(move):
+    return FOUNDATION_BONUS if move.move_type in FOUNDATION_MOVE_TYPES else 0.0
+
+def search_best_move_parallel(game, depth=7, recent_moves=None, workers=None, split_depth=1, cancel=None):
+    """
+    Parallel equivalent of search_best_move at the root.
+
+    Returns (score, move). split_depth=2 splits one ply deeper, which gives
+    the pool more, smaller tasks when the root has few moves.
+    """
+    from concurrent.futures import wait, FIRST_COMPLETED
+
+    legal_moves = get_search_moves(game)
+    if depth == 0 or not legal_moves:
+        return score_state(game), None
+    if recent_moves:
+        legal_moves = filter_recent_moves(legal_moves, recent_moves)
+    foundation_moves = [m for m in legal_moves if m.move_type in FOUNDATION_MOVE_TYPES]
+    if foundation_moves:
+        return FOUNDATION_BONUS, foundation_moves[0]
+    legal_moves.sort(key=move_priority, reverse=True)
+
+    executor = get_executor(workers)
+    # set on cancel so the subtrees already running stop as well
+    stop = shared_event() if cancel is not None else None
+    root_key = zobrist_key(game)
+    # per root move: fixed score for leaves/cycles, or a list of (bonus, future)
+    branches = []
+    futures = []
+    for move in legal_moves:
+        undo = do_move(game, move)
+        child_key = zobrist_key(game)
+        if child_key == root_key:
+            branches.append(-float("inf"))
+        elif depth == 1:
+            branches.append(score_state(game))
+        elif split_depth < 2 or depth < 3:
+            future = executor.submit(_search_subtree, GameState.from_game(game).data, depth - 1, (root_key,), stop)
+            branches.append([(0.0, future)])
+            futures.append(future)
+        else:
+            replies = get_search_moves(game)
+            if not replies:
+                branches.append(score_state(game))
+            else:
+                parts = []
+                for reply in replies:
+                    reply_undo = do_move(game, reply)
+                    future = executor.submit(_search_subtree, GameState.from_game(game).data, depth - 2, (root_key, child_key), stop)
+                    undo_move(game, reply, reply_undo)
+                    parts.append((_bonus(reply), future))
+                    futures.append(future)
+                branches.append(parts)
+        undo_move(game, move, undo)
+
+    pending = set(futures)
+    while pending:
+        _, pending = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+        if cancel is not None and cancel.is_set():
+            stop.set()
+            for future in pending:
+                future.cancel()
+            raise SearchAborted()
+
+    scores = []
+    for move, branch in zip(legal_moves, branches):
+        if isinstance(branch, list):
+            score = max(bonus + future.result() for bonus, future in branch)
+        else:
+            score = branch
+        scores.append(score + _bonus(move))
+    best_score = max(scores)
+    # same tie rule as the serial search: within 5.0 of the best counts as a
+    # tie, and ties avoid stock moves and longer draw chains; the earliest
+    # move wins what is left
+    ties = [m for m, score in zip(legal_moves, scores) if score >= best_score - 5.0]
+    non_draw_moves = [m for m in ties if m.move_type not in ["draw_stock", "reset_stock"]]
+    return best_score, cheapest_moves(game, non_draw_moves or ties)[0]
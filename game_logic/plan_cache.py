@@ -0,0 +1,73 @@
+"""
+Plan cache for the Auto Tree and Auto Graph buttons.
+
+A search finds a whole line of moves (the graph search's path to its best
+state, the tree search's principal variation) but a button click plays only
+its first move. PlanCache keeps the line, keyed by the Zobrist key of the
+state each move is played from. While the board stays on the line the next
+click gets its move straight from the cache; only once the board leaves the
+line, or reaches its end, does the button search again, from there. The
+tail past the end of the line is searched when the board gets there,
+never in advance, since a search started from a state the board is not in
+yet would be cancelled by the hint worker.
+
+Spotting a deviation is one dict lookup on the state's key (zobrist_key is
+one pass over the cards, nothing next to a search). Keys do not depend on
+column order, so moves are stored as column-independent signatures too
+(see transposition.py) and matched against the board they are played on.
+"""
+
+from .move_utils import do_move, undo_move, get_search_moves, is_legal_move
+from .zobrist import ZobristHasher, zobrist_key
+from .transposition import move_signature, find_move
+
+class PlanCache:
+    def __init__(self):
+        # state key -> (move, its signature) to play from that state
+        self.moves = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.moves)
+
+    def clear(self):
+        self.moves.clear()
+
+    def store(self, game, line):
+        """cache line, moves starting from game's current state; game is left as it was"""
+        self.moves.clear()
+        hasher = ZobristHasher(game)
+        undos = []
+        for move in line:
+            self.moves[hasher.key] = (move, move_signature(game, move))
+            undo = do_move(game, move)
+            hasher.push(game, move, undo)
+            undos.append((move, undo))
+        for move, undo in reversed(undos):
+            undo_move(game, move, undo)
+
+    def next_move(self, game):
+        """the cached move for game's current state, or None if the board left the line"""
+        entry = self.moves.get(zobrist_key(game))
+        if entry is None:
+            self.misses += 1
+            return None
+        move, signature = entry
+        if not is_legal_move(game, move) or move_signature(game, move) != signature:
+            # the same position with its columns in another order
+            move = find_move(game, get_search_moves(game), signature)
+        if move is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return move
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.moves),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
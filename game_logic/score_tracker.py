@@ -0,0 +1,119 @@
+"""
+Incremental evaluation of Solitaire states.
+
+score_state scans every foundation and every board column, which is a good
+part of the cost of a search leaf. A move only touches one or two piles, so
+ScoreTracker keeps the counts the score is built from (see
+score_components) and adjusts them as moves are applied and undone; the
+score itself is then a handful of arithmetic operations on those counts,
+through the same score_from_components, so it matches score_state exactly.
+
+The per-column part (empty / king under other cards) is kept as two bit
+masks with one bit per column, and only the columns a move touched are
+looked at again. The whole tracked state is one small tuple, so saving
+it for pop() costs a single list append.
+
+With check=True (or SCORE_DEBUG in config) every update is verified against
+a full score_components scan, and the score against score_state.
+"""
+
+from config import SUITS, KING, BOARD_COLUMNS, SCORE_DEBUG
+from .move_utils import score_components, score_from_components, score_state
+
+# number of set bits for every column mask
+_BIT_COUNT = [bin(mask).count("1") for mask in range(1 << BOARD_COLUMNS)]
+
+def _update_masks(empty_mask, king_mask, pile, col) -> tuple:
+    # the column masks with the bits of a column the move changed brought up to date
+    bit = 1 << col
+    cards = pile.cards
+    if not cards:
+        return empty_mask | bit, king_mask & ~bit
+    if cards[0].rank == KING and len(cards) > 1:
+        return empty_mask & ~bit, king_mask | bit
+    return empty_mask & ~bit, king_mask & ~bit
+
+class ScoreTracker:
+    """
+    Tracks score_state of one game while a search mutates it.
+
+    Call push(game, move, undo) right after do_move and pop() right after
+    the matching undo_move, just like ZobristHasher.
+    """
+
+    def __init__(self, game, check=None):
+        foundation_total, foundation_squares, revealed, _, _, stock, waste = score_components(game)
+        empty_mask = king_mask = 0
+        for col, pile in enumerate(game.Board):
+            empty_mask, king_mask = _update_masks(empty_mask, king_mask, pile, col)
+        # (foundation total, squared foundation sizes, revealed, stock, waste,
+        #  empty columns mask, king columns mask)
+        self.state = (foundation_total, foundation_squares, revealed, stock, waste, empty_mask, king_mask)
+        self.history = []
+        self.check = SCORE_DEBUG if check is None else check
+        if self.check:
+            self._verify(game)
+
+    @property
+    def components(self) -> tuple:
+        """the same tuple score_components(game) returns"""
+        foundation_total, foundation_squares, revealed, stock, waste, empty_mask, king_mask = self.state
+        return (foundation_total, foundation_squares, revealed, _BIT_COUNT[empty_mask], _BIT_COUNT[king_mask], stock, waste)
+
+    @property
+    def score(self) -> float:
+        return score_from_components(*self.components)
+
+    def push(self, game, move, undo):
+        """update the counts for a move that do_move has just applied to game"""
+        moved, flipped = undo
+        state = self.state
+        self.history.append(state)
+        foundation_total, foundation_squares, revealed, stock, waste, empty_mask, king_mask = state
+        m = move
+        if m.move_type == "draw_stock":
+            stock -= moved
+            waste += moved
+        elif m.move_type == "reset_stock":
+            stock += moved
+            waste -= moved
+        elif m.move_type == "waste_to_foundation":
+            waste -= 1
+            foundation_total += 1
+            # the foundation has just grown from size - 1 to size
+            foundation_squares += 2 * game.foundations[SUITS[m.dst]].size() - 1
+        elif m.move_type == "waste_to_Board":
+            waste -= 1
+            revealed += 1
+            empty_mask, king_mask = _update_masks(empty_mask, king_mask, game.Board[m.dst], m.dst)
+        elif m.move_type == "Board_to_foundation":
+            if moved:
+                revealed += flipped - 1
+                foundation_total += 1
+                foundation_squares += 2 * game.foundations[SUITS[m.dst]].size() - 1
+                empty_mask, king_mask = _update_masks(empty_mask, king_mask, game.Board[m.src], m.src)
+        elif m.move_type in ("talon_to_foundation", "talon_to_Board"):
+            stock = game.stock.size()
+            waste = game.waste.size()
+            if m.move_type == "talon_to_foundation":
+                foundation_total += 1
+                foundation_squares += 2 * game.foundations[SUITS[m.dst]].size() - 1
+            else:
+                revealed += 1
+                empty_mask, king_mask = _update_masks(empty_mask, king_mask, game.Board[m.dst], m.dst)
+        elif m.move_type == "Board_to_Board":
+            if moved:
+                revealed += flipped
+                empty_mask, king_mask = _update_masks(empty_mask, king_mask, game.Board[m.src], m.src)
+                empty_mask, king_mask = _update_masks(empty_mask, king_mask, game.Board[m.dst], m.dst)
+        self.state = (foundation_total, foundation_squares, revealed, stock, waste, empty_mask, king_mask)
+        if self.check:
+            self._verify(game)
+
+    def pop(self):
+        """restore the counts from before the last push"""
+        self.state = self.history.pop()
+
+    def _verify(self, game):
+        assert self.components == score_components(game), "incremental score components out of sync"
+        assert self.score == score_state(game), "incremental score differs from score_state"
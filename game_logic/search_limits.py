@@ -0,0 +1,44 @@
+"""
+Time and node budgets for anytime searches.
+
+A SearchLimits object is passed down through a search and ticked once per
+expanded node. When the wall-clock or node budget runs out, tick raises
+SearchAborted so the search can unwind (restoring the game with undo_move
+on the way) and the caller can fall back to its last completed result.
+The object also carries the statistics of the run (nodes expanded, depth
+completed) back to the caller, and for the tree search the root moves the
+current iteration has finished, so an iteration cut short is not wasted.
+
+An optional cancel event (anything with is_set(), e.g. threading.Event)
+aborts the search the same way, so another thread can stop it early.
+"""
+
+import time
+
+class SearchAborted(Exception):
+    """raised when a search runs out of its time or node budget, or is cancelled"""
+
+class SearchLimits:
+    def __init__(self, time_budget=None, node_budget=None, cancel=None):
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.cancel = cancel
+        self.start_time = time.perf_counter()
+        self.deadline = None if time_budget is None else self.start_time + time_budget
+        self.nodes = 0
+        self.depth_reached = 0
+        self.root_done = []     # root moves searched to the full depth
+        self.root_best = None   # (best score, tied best moves) among them
+
+    def tick(self):
+        """count one expanded node, raising SearchAborted if over budget"""
+        self.nodes += 1
+        if self.node_budget is not None and self.nodes > self.node_budget:
+            raise SearchAborted()
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchAborted()
+        if self.cancel is not None and self.cancel.is_set():
+            raise SearchAborted()
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start_time) * 1000
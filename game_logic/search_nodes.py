@@ -0,0 +1,88 @@
+"""
+Compact search-tree storage for the graph searches.
+
+Instead of keeping a game (or the whole move path) per node, SearchNodes
+stores for every node only its parent index, the encoded move that led to
+it (see move_utils.encode_move) and its depth, in three flat arrays, 12
+bytes a node on 64-bit Linux (nbytes() gives the exact total). The path to
+any node is rebuilt from the parent links.
+
+NodeWalker moves one shared game between nodes: the game always sits at
+the end of the current path from the root, and going to another node
+undoes the path back to the deepest common ancestor and replays the other
+node's moves from there. Searches that expand nodes in creation order
+(BFS) or mostly continue below the last node (best-first) only move a few
+steps each time. Trackers such as ZobristHasher and ScoreTracker follow
+the walk through their push/pop.
+"""
+
+from array import array
+from .move_utils import do_move, undo_move, encode_move, decode_move
+
+ROOT = 0
+
+class SearchNodes:
+    __slots__ = ("parents", "codes", "depths")
+
+    def __init__(self):
+        # node 0 is the root
+        self.parents = array("l", [-1])
+        self.codes = array("H", [0])
+        self.depths = array("H", [0])
+
+    def __len__(self):
+        return len(self.parents)
+
+    def add(self, parent: int, move) -> int:
+        """record a child of parent reached by move and return its index"""
+        self.parents.append(parent)
+        self.codes.append(encode_move(move))
+        self.depths.append(self.depths[parent] + 1)
+        return len(self.parents) - 1
+
+    def move(self, node: int):
+        """the move that led to node"""
+        return decode_move(self.codes[node])
+
+    def line(self, node: int) -> list:
+        """the moves from the root to node"""
+        parents, codes = self.parents, self.codes
+        moves = []
+        while parents[node] >= 0:
+            moves.append(decode_move(codes[node]))
+            node = parents[node]
+        moves.reverse()
+        return moves
+
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self.parents, self.codes, self.depths))
+
+class NodeWalker:
+    def __init__(self, game, nodes: SearchNodes, trackers=()):
+        self.game = game
+        self.nodes = nodes
+        self.trackers = trackers
+        self.path = [ROOT]    # node at every depth of the current path
+        self.undos = []       # (move, undo record) that led to each of them
+
+    def go_to(self, node: int):
+        """bring the game to the state of node"""
+        path, parents, depths = self.path, self.nodes.parents, self.nodes.depths
+        branch = []
+        while depths[node] >= len(path) or path[depths[node]] != node:
+            branch.append(node)
+            node = parents[node]
+        game, trackers = self.game, self.trackers
+        while len(path) > depths[node] + 1:
+            move, undo = self.undos.pop()
+            path.pop()
+            for tracker in trackers:
+                tracker.pop()
+            undo_move(game, move, undo)
+        for node in reversed(branch):
+            move = self.nodes.move(node)
+            undo = do_move(game, move)
+            for tracker in trackers:
+                tracker.push(game, move, undo)
+            path.append(node)
+            self.undos.append((move, undo))
@@ -0,0 +1,157 @@
+"""
+Headless Solitaire game model and rules.
+
+Holds the SolitaireGame state (stock, waste, foundations and board columns)
+and the functions that change it according to the rules. Nothing here
+imports pygame, so worker processes, the batch solver and tools can use
+the game without loading the UI; main.py is a thin pygame layer on top.
+"""
+
+# Deals are built from a deal number (a shuffle seed) or restored exactly
+# from a deal code, so any game can be replayed
+from .deal_codec import shuffled_deck, random_deal_number, deck_to_code, deck_from_code
+
+# Moves are generated, checked and applied by the shared move utilities
+from .move_utils import make_move, is_legal_move, do_move, expand_move, MAX_COLUMN_LENGTH
+from .talon import can_recycle
+
+# Every card's pile and position, kept up to date by do_move
+from .card_index import CardLocations
+
+from config import BOARD_COLUMNS
+from data_structures.cards import Card
+from data_structures.foundation import FoundationPile
+from data_structures.board import BoardPile
+from data_structures.stock import StockPile
+from data_structures.waste import WastePile
+from data_structures.talon import Talon
+
+
+# This is the SolitaireGame class which stores all of the 
+# active states of the game. Here we store the piles that 
+# the user plays on
+class SolitaireGame:
+    # deal_number picks a reproducible shuffle; deal_code restores an exact
+    # deck order (see game_logic/deal_codec.py). With neither, a random deal
+    # number is chosen so the game can still be replayed later.
+    def __init__(self, deal_number=None, deal_code=None):
+        if deal_number is None and deal_code is None:
+            deal_number = random_deal_number()
+        self.deal_number = deal_number
+        self.deal_code = deal_code
+
+        # decks that handle everything that has to do with drawing cards;
+        # DRAW_COUNT and MAX_RECYCLES in config set the rules, recycles
+        # counts how often the waste has been turned over so far. The stock
+        # and waste are two views of one talon
+        self.talon = Talon()
+        self.stock = StockPile(self.talon)
+        self.waste = WastePile(self.talon)
+        self.recycles = 0
+
+        # one foundation per suit of card
+        self.foundations = {
+            "H": FoundationPile("H"),
+            "D": FoundationPile("D"),
+            "C": FoundationPile("C"),
+            "S": FoundationPile("S")
+        }
+
+
+        # This creates a list with the number of Board columns defined in config
+        self.Board = [BoardPile() for _ in range(BOARD_COLUMNS)] # 
+
+        self.deal_cards() 
+        self.locations = CardLocations(self)
+
+
+    def create_deck(self) -> list[Card]:
+        if self.deal_code is not None:
+            return deck_from_code(self.deal_code)
+        return shuffled_deck(self.deal_number)
+
+    # This function deals an x amount of cards increasing from 1 to 8 
+    # to each of the board columns and adds the remaining cards to the 
+    # stock
+    def deal_cards(self):
+        deck = self.create_deck()
+        self.deal_code = deck_to_code(deck)
+        deck_index = 0
+
+        for i in range(BOARD_COLUMNS):
+            for j in range(i + 1):
+                # only the last card of each column is face-up
+                self.Board[i].push(deck[deck_index], j == i)
+                deck_index += 1
+
+        # the rest goes to the stock; the last card is drawn first
+        self.talon.set(reversed(deck[deck_index:]))
+    
+    def is_won(self) -> bool:
+        for suit in ["H", "D", "C", "S"]:
+            if len(self.foundations[suit].cards) != 13:
+                return False
+        return True
+    
+    def has_valid_moves(self) -> bool:
+        if self.stock.size() > 0 or (self.waste.size() > 0 and can_recycle(self)):
+            return True
+        for pile in self.Board:
+            if pile.size() > 0:
+                for other_pile in self.Board:
+                    if pile is not other_pile and other_pile.can_add(pile.peek()):
+                        return True
+        return False
+
+
+# This function turns a click in the UI (the selected card or run and the
+# pile clicked next) into a Move and plays it if it is legal
+def attempt_move(game: SolitaireGame, selected: dict, target: tuple[str, int]) -> bool:
+    src_type = selected["type"]
+    src_idx = selected.get("index", -1)
+    dst_type, dst_idx = target
+
+    if src_type == "waste" and game.waste.size() > 0:
+        if dst_type == "foundation":
+            move = make_move("waste_to_foundation", dst=dst_idx)
+        elif dst_type == "Board":
+            move = make_move("waste_to_Board", dst=dst_idx)
+        else:
+            return False
+        return apply_move_to_game(game, move)
+
+    if src_type == "Board" and game.Board[src_idx].size() > 0:
+        src_card_index = selected.get("card_index", len(game.Board[src_idx].cards) - 1)
+        if not 0 <= src_card_index < MAX_COLUMN_LENGTH:
+            return False
+        if dst_type == "foundation":
+            move = make_move("Board_to_foundation", src_idx, dst_idx, src_card_index)
+        elif dst_type == "Board":
+            move = make_move("Board_to_Board", src_idx, dst_idx, src_card_index)
+        else:
+            return False
+        return apply_move_to_game(game, move)
+
+    return False
+
+
+def apply_move_to_game(game, move):
+    """apply a Move object to the actual game state, if it is legal there"""
+    if not move or not is_legal_move(game, move):
+        return False
+    do_move(game, move)
+    return True
+
+
+def play_move(game, move):
+    """
+    play a move chosen by an AI; stock/waste macro-moves are expanded into
+    the single draws and waste move they stand for. Returns how many
+    single moves were played (0 if the move is not legal here).
+    """
+    if not move or not is_legal_move(game, move):
+        return 0
+    steps = expand_move(game, move)
+    for step in steps:
+        do_move(game, step)
+    return len(steps)
@@ -0,0 +1,170 @@
+"""
+Full-game solver for Solitaire using weighted A*.
+
+The tree and graph searches only look a few moves ahead for a good score.
+The solver searches for a complete winning line instead: best-first over
+states, ordered by f = g + weight * h where
+- g: single moves played so far (a stock macro-move counts its draws)
+- h: cards not on the foundations yet; every move puts at most one card
+  there, so h never overestimates and with weight 1 the first win found
+  is a shortest one. A larger weight finds wins much faster, at most
+  weight times longer than the shortest.
+
+A state with no face-down cards and an empty stock and waste is won
+outright (the lowest card left is always on top of a column), so the rest
+of the line is filled in directly instead of searched. A foundation move
+that can never hurt (see _safe_move) is played as the only child.
+
+Nodes are not stored as games: every node keeps only its parent index,
+the encoded move that led to it and its depth (see search_nodes.py), plus
+its Zobrist key, and the closed set is a FingerprintMap from raw 64-bit
+keys to the cheapest move count (see fingerprint_set.py). The open list is a heap of (f, ..., node) entries and a
+single work game is walked from node to node by a NodeWalker. Duplicate
+states are recognised by their Zobrist key with the cheapest move count
+seen. If the open list runs empty the deal has no solution at all (the
+macro-moves reach every stock card, so nothing is missed); if the node or
+time budget runs out first the answer is unknown.
+
+Algorithm: weighted A* with duplicate detection
+Time Complexity: O(N log N) for N generated states
+Space Complexity: O(N)
+"""
+
+import copy
+import heapq
+from array import array
+from config import SOLVER_WEIGHT, SOLVER_NODE_BUDGET, DRAW_COUNT
+from .move_utils import do_move, undo_move, get_search_moves, move_cost, make_move
+from .zobrist import ZobristHasher
+from .search_limits import SearchLimits, SearchAborted
+from .search_nodes import SearchNodes, NodeWalker, ROOT
+from .fingerprint_set import FingerprintMap
+from .deal_codec import DECK_SIZE
+
+WON = "won"
+NO_SOLUTION = "no solution"
+UNKNOWN = "unknown"
+
+_OTHER_COLOUR = {"H": ("C", "S"), "D": ("C", "S"), "C": ("H", "D"), "S": ("H", "D")}
+
+class SolveResult:
+    __slots__ = ("status", "moves", "cost", "nodes", "seconds")
+
+    def __init__(self, status, moves, cost, nodes, seconds):
+        self.status = status
+        self.moves = moves      # search moves (macro-moves included) from the start state
+        self.cost = cost        # single moves the line takes when played out
+        self.nodes = nodes
+        self.seconds = seconds
+
+    @property
+    def won(self) -> bool:
+        return self.status == WON
+
+    @property
+    def nodes_per_sec(self) -> float:
+        return self.nodes / self.seconds if self.seconds > 0 else 0.0
+
+def _cards_left(game) -> int:
+    return DECK_SIZE - sum(pile.size() for pile in game.foundations.values())
+
+def _all_face_up(game) -> bool:
+    return game.talon.size() == 0 and all(pile.face_down == 0 for pile in game.Board)
+
+def _safe_move(game):
+    """
+    a foundation move no solution can lose by: the card is a two or lower,
+    or both cards of the other colour one rank below are already on the
+    foundations, so nothing can be built on it any more. The solver plays
+    such a move as the only child of its state. With DRAW_COUNT > 1 taking
+    a card out of the waste changes which stock cards come up, so only
+    board cards count then.
+    """
+    foundations = game.foundations
+    card = game.waste.peek() if DRAW_COUNT == 1 else None
+    candidates = [(card, None)] if card is not None else []
+    for col, pile in enumerate(game.Board):
+        if pile.size() > pile.face_down:
+            candidates.append((pile.peek(), col))
+    for card, col in candidates:
+        if not foundations[card.suit].can_add(card):
+            continue
+        if card.rank > 2 and any(foundations[suit].size() < card.rank - 1
+                                 for suit in _OTHER_COLOUR[card.suit]):
+            continue
+        if col is None:
+            return make_move("waste_to_foundation", dst=card.suit_index)
+        return make_move("Board_to_foundation", col, card.suit_index, game.Board[col].size() - 1)
+    return None
+
+def _finish(game) -> list:
+    """
+    play out a state with every card face-up on the board; the lowest card
+    left is always on top of its column, so a foundation move always exists
+    """
+    moves = []
+    while _cards_left(game):
+        for col, pile in enumerate(game.Board):
+            card = pile.peek()
+            if card is not None and game.foundations[card.suit].can_add(card):
+                move = make_move("Board_to_foundation", col, card.suit_index, pile.size() - 1)
+                do_move(game, move)
+                moves.append(move)
+                break
+    return moves
+
+def _face_down(game) -> int:
+    return sum(pile.face_down for pile in game.Board)
+
+def solve(game, weight=SOLVER_WEIGHT, limits=None) -> SolveResult:
+    """
+    search for a winning line from the current state; the game itself is
+    left untouched. limits defaults to a SOLVER_NODE_BUDGET node budget.
+    """
+    if limits is None:
+        limits = SearchLimits(node_budget=SOLVER_NODE_BUDGET)
+    work = copy.deepcopy(game)
+    nodes = SearchNodes()
+    hasher = ZobristHasher(work)
+    walker = NodeWalker(work, nodes, (hasher,))
+    # state key of every generated node, next to the parent links
+    keys = array("Q", [hasher.key])
+    # cheapest move count seen per state, by raw 64-bit key; the node
+    # budget bounds its size, so it has no memory cap of its own
+    best_g = FingerprintMap(max_mb=None)
+    best_g.put(hasher.key, 0)
+    h = _cards_left(work)
+    # (f, h, face-down cards, -node, g): among equal f prefer fewer cards
+    # left, then fewer face-down cards, then the newest node
+    open_list = [(weight * h, h, _face_down(work), -ROOT, 0)]
+    while open_list:
+        _, h, _, node, g = heapq.heappop(open_list)
+        node = -node
+        if best_g.get(keys[node]) < g:
+            # reached more cheaply after this entry was queued
+            continue
+        try:
+            limits.tick()
+        except SearchAborted:
+            return SolveResult(UNKNOWN, [], 0, limits.nodes, limits.elapsed_ms() / 1000)
+        walker.go_to(node)
+        if _all_face_up(work):
+            finish = _finish(copy.deepcopy(work))
+            return SolveResult(WON, nodes.line(node) + finish, g + len(finish),
+                               limits.nodes, limits.elapsed_ms() / 1000)
+        safe = _safe_move(work)
+        for move in ([safe] if safe else get_search_moves(work)):
+            child_g = g + move_cost(work, move)
+            undo = do_move(work, move)
+            hasher.push(work, move, undo)
+            child_key = hasher.key
+            known = best_g.get(child_key)
+            if known is None or child_g < known:
+                best_g.put(child_key, child_g)
+                child_h = _cards_left(work)
+                child = nodes.add(node, move)
+                keys.append(child_key)
+                heapq.heappush(open_list, (child_g + weight * child_h, child_h, _face_down(work), -child, child_g))
+            hasher.pop()
+            undo_move(work, move, undo)
+    return SolveResult(NO_SOLUTION, [], 0, limits.nodes, limits.elapsed_ms() / 1000)
@@ -0,0 +1,102 @@
+"""
+Stock/waste macro-moves over the talon.
+
+The game keeps its stock and waste as one talon (data_structures/talon.py):
+the waste bottom to top, then the stock in the order it will be drawn.
+Draws and resets never change that order; only the cursor between waste
+and stock moves.
+
+That lets a search play any talon card directly instead of spending its
+depth on long chains of draw_stock moves: the "talon_to_foundation" and
+"talon_to_Board" macro-moves (see move_utils) name the card by its talon
+index and cost the number of draws and resets it takes to bring that card
+to the top of the waste. After a macro-move the talon has lost that card
+and the waste holds exactly the cards that were before it, which is the
+same position the individual draws would have produced.
+
+Which talon cards can be brought up at all depends only on the talon size,
+the waste size, whether a reset is still allowed (MAX_RECYCLES) and
+DRAW_COUNT, so the answer is computed once per combination and cached:
+- this pass: every DRAW_COUNT-th card after the waste top, and the last
+  card of the stock
+- after one reset: every DRAW_COUNT-th card from the bottom of the talon,
+  and the last one (a second reset would only repeat the same cards)
+"""
+
+from functools import lru_cache
+from config import BOARD_COLUMNS, DRAW_COUNT, MAX_RECYCLES
+from .card_index import TALON_PILE
+
+# cards left in the stock after the deal
+MAX_TALON_LENGTH = 52 - BOARD_COLUMNS * (BOARD_COLUMNS + 1) // 2
+
+def can_recycle(game) -> bool:
+    """whether the waste may still be turned over into the stock"""
+    return MAX_RECYCLES is None or game.recycles < MAX_RECYCLES
+
+@lru_cache(maxsize=None)
+def reachable_indices(talon_size: int, waste_size: int, can_reset: bool, draw_count: int = DRAW_COUNT) -> tuple:
+    """
+    (index, cost, via_reset) for every talon index that draws (and at most
+    one reset) can bring to the top of the waste, cheapest first. cost
+    counts the draw and reset moves; the current waste top is left out
+    since the plain waste moves already play it.
+    """
+    reachable = []
+    seen = {waste_size - 1}
+    # draw through the rest of this pass
+    cost = 0
+    top = waste_size - 1
+    while top < talon_size - 1:
+        cost += 1
+        top = min(top + draw_count, talon_size - 1)
+        reachable.append((top, cost, False))
+        seen.add(top)
+    if can_reset and talon_size > 0:
+        # reset (one move), then draw from the bottom of the talon again
+        cost += 1
+        top = -1
+        while top < talon_size - 1:
+            cost += 1
+            top = min(top + draw_count, talon_size - 1)
+            if top not in seen:
+                reachable.append((top, cost, True))
+                seen.add(top)
+    return tuple(reachable)
+
+@lru_cache(maxsize=None)
+def _routes(talon_size: int, waste_size: int, can_reset: bool, draw_count: int) -> dict:
+    return {index: (cost, via_reset) for index, cost, via_reset in reachable_indices(talon_size, waste_size, can_reset, draw_count)}
+
+def talon_route(game, index: int):
+    """(cost, via_reset) to bring the talon card at index to the waste top, or None if it can't be"""
+    talon = game.talon
+    return _routes(len(talon.cards), talon.cursor, can_recycle(game), DRAW_COUNT).get(index)
+
+def reachable_talon_cards(game) -> tuple:
+    """(index, cost, via_reset) for every talon card a macro-move can play, cheapest first"""
+    talon = game.talon
+    return reachable_indices(len(talon.cards), talon.cursor, can_recycle(game), DRAW_COUNT)
+
+def talon_card(game, index: int):
+    return game.talon.cards[index]
+
+def take_talon_card(game, index: int):
+    """
+    remove the talon card at index as a macro-move does and return
+    (card, waste size before), which put_talon_card needs to undo it
+    """
+    talon = game.talon
+    waste_size = talon.cursor
+    card = talon.take(index)
+    talon.cursor = index
+    # the cards after it moved down one talon index
+    game.locations.place(talon.cards[index:], TALON_PILE, index)
+    return card, waste_size
+
+def put_talon_card(game, index: int, card, waste_size: int):
+    """undo take_talon_card"""
+    talon = game.talon
+    talon.put(index, card)
+    talon.cursor = waste_size
+    game.locations.place(talon.cards[index:], TALON_PILE, index)
@@ -0,0 +1,142 @@
+"""
+Bounded transposition table for the tree search.
+
+Remembers, per Zobrist state key, the score a subtree search produced, the
+depth it was searched to, the best move and whether the score is exact or
+only a lower bound (some branches were cut off as cycles back to positions
+above it, so the score depends on the path). Scores are only reused at the
+depth they were searched to. The table is meant to live for a whole game so
+consecutive hint / auto-play requests reuse each other's work.
+
+Memory is capped by a byte budget which is turned into an entry capacity.
+Two replacement policies are available:
+- "depth": direct-mapped slots; a slot is only overwritten by an entry
+  searched at least as deep (or for the same position)
+- "lru": least recently used entry is evicted when the table is full
+
+Stored moves are kept as signatures that do not depend on column indices,
+because states that differ only by column order share a key.
+"""
+
+from collections import OrderedDict
+from config import TRANSPOSITION_TABLE_MB, TRANSPOSITION_POLICY
+from .move_utils import moving_card
+
+EXACT = 0
+LOWER_BOUND = 1
+
+# rough per-entry cost in bytes (entry tuple, key, score and signature)
+ENTRY_BYTES = 200
+
+class TTEntry:
+    __slots__ = ("key", "depth", "score", "move", "bound")
+
+    def __init__(self, key, depth, score, move, bound):
+        self.key = key
+        self.depth = depth
+        self.score = score
+        self.move = move
+        self.bound = bound
+
+class TranspositionTable:
+    def __init__(self, max_mb=TRANSPOSITION_TABLE_MB, policy=TRANSPOSITION_POLICY):
+        if policy not in ("depth", "lru"):
+            raise ValueError(f"unknown replacement policy: {policy}")
+        self.policy = policy
+        self.capacity = max(1, int(max_mb * 1024 * 1024) // ENTRY_BYTES)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.clear()
+
+    def clear(self):
+        if self.policy == "depth":
+            self.slots = [None] * self.capacity
+        else:
+            self.slots = OrderedDict()
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def probe(self, key):
+        """return the entry stored for key, or None"""
+        if self.policy == "depth":
+            entry = self.slots[key % self.capacity]
+            if entry is not None and entry.key != key:
+                entry = None
+        else:
+            entry = self.slots.get(key)
+            if entry is not None:
+                self.slots.move_to_end(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def peek(self, key):
+        """like probe, but without touching the counters or LRU order"""
+        if self.policy == "depth":
+            entry = self.slots[key % self.capacity]
+            return entry if entry is not None and entry.key == key else None
+        return self.slots.get(key)
+
+    def store(self, key, depth, score, move, bound=EXACT):
+        entry = TTEntry(key, depth, score, move, bound)
+        self.stores += 1
+        if self.policy == "depth":
+            idx = key % self.capacity
+            old = self.slots[idx]
+            if old is None:
+                self.size += 1
+            elif old.key != key:
+                if old.depth > depth:
+                    return
+                self.evictions += 1
+            self.slots[idx] = entry
+            return
+        if key in self.slots:
+            self.slots.move_to_end(key)
+        else:
+            self.size += 1
+            if self.size > self.capacity:
+                self.slots.popitem(last=False)
+                self.size -= 1
+                self.evictions += 1
+        self.slots[key] = entry
+
+    def stats(self) -> dict:
+        probes = self.hits + self.misses
+        return {
+            "entries": self.size,
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / probes if probes else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+# ---------------- COLUMN-INDEPENDENT MOVES ----------------
+def _card_id(card):
+    return (card.rank, card.suit) if card else None
+
+def move_signature(game, move):
+    """describe a move by the cards involved rather than column indices"""
+    if move is None:
+        return None
+    target = None
+    if move.move_type in ("Board_to_Board", "waste_to_Board", "talon_to_Board"):
+        target = _card_id(game.Board[move.dst].peek())
+    return (move.move_type, _card_id(moving_card(game, move)), target)
+
+def find_move(game, moves, signature):
+    """return the move in moves matching a stored signature, if any"""
+    if signature is None:
+        return None
+    for move in moves:
+        if move.move_type == signature[0] and move_signature(game, move) == signature:
+            return move
+    return None
@@ -0,0 +1,194 @@
+"""
+Incremental Zobrist hashing of Solitaire states.
+
+Gives every position a 64-bit key that is updated in O(cards moved) as moves
+are applied, instead of rebuilding serialize_state tuples for every node.
+
+The key keeps serialize_state's equivalence under column permutation: each
+board column is hashed on its own (XOR of per-position card keys), passed
+through a 64-bit mixer and the mixed column hashes are summed, so the board
+part only depends on the multiset of columns. Foundations, stock and waste
+are XORed on top with their own key tables, and so is the number of
+recycles used when MAX_RECYCLES limits them.
+
+With check=True (or ZOBRIST_DEBUG in config) every update is verified
+against a full recomputation, and every key is compared with the full
+serialize_state of the position to catch collisions.
+"""
+
+import random
+from config import SUITS, KING, ZOBRIST_DEBUG, MAX_RECYCLES
+from .game_state import card_code
+from .move_utils import serialize_state, MAX_COLUMN_LENGTH
+from .talon import MAX_TALON_LENGTH
+
+MASK = (1 << 64) - 1
+
+# fixed seed so keys are identical across runs and worker processes
+_rng = random.Random(0x5EED5EED)
+COLUMN_KEYS = [[_rng.getrandbits(64) for _ in range(52 * 2)] for _ in range(MAX_COLUMN_LENGTH)]
+FOUNDATION_KEYS = [[_rng.getrandbits(64) for _ in range(KING + 1)] for _ in SUITS]
+STOCK_KEYS = [[_rng.getrandbits(64) for _ in range(52)] for _ in range(MAX_TALON_LENGTH)]
+WASTE_KEYS = [[_rng.getrandbits(64) for _ in range(52)] for _ in range(MAX_TALON_LENGTH)]
+RECYCLE_KEYS = [_rng.getrandbits(64) for _ in range((MAX_RECYCLES or 0) + 1)]
+del _rng
+
+_SUIT_INDEX = {suit: i for i, suit in enumerate(SUITS)}
+
+def _mix(h):
+    # splitmix64 finalizer; maps 0 to 0 so empty columns add nothing
+    h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & MASK
+    return h ^ (h >> 31)
+
+def _card_key(pos, card, revealed):
+    return COLUMN_KEYS[pos][card_code(card) * 2 + revealed]
+
+def _column_hash(pile):
+    h = 0
+    for pos, c in enumerate(pile.cards):
+        h ^= _card_key(pos, c, pos >= pile.face_down)
+    return h
+
+def _foundation_hash(game):
+    h = 0
+    for i, suit in enumerate(SUITS):
+        h ^= FOUNDATION_KEYS[i][game.foundations[suit].size()]
+    return h
+
+def _talon_hash(keys, cards):
+    h = 0
+    for pos, c in enumerate(cards):
+        h ^= keys[pos][card_code(c)]
+    return h
+
+def _recycle_hash(game):
+    # with unlimited recycles the count changes nothing, so it is left out
+    return RECYCLE_KEYS[game.recycles] if MAX_RECYCLES is not None else 0
+
+def zobrist_key(game) -> int:
+    """full (non-incremental) key of a game state"""
+    board = 0
+    for pile in game.Board:
+        board = (board + _mix(_column_hash(pile))) & MASK
+    return (board ^ _foundation_hash(game)
+            ^ _talon_hash(STOCK_KEYS, game.stock.cards)
+            ^ _talon_hash(WASTE_KEYS, game.waste.cards)
+            ^ _recycle_hash(game))
+
+class ZobristHasher:
+    """
+    Tracks the key of one game while a search mutates it.
+
+    Call push(game, move, undo) right after do_move and pop() right after
+    the matching undo_move.
+    """
+
+    def __init__(self, game, check=None):
+        self.columns = [_column_hash(pile) for pile in game.Board]
+        self.board = 0
+        for h in self.columns:
+            self.board = (self.board + _mix(h)) & MASK
+        self.foundation = _foundation_hash(game)
+        self.stock = _talon_hash(STOCK_KEYS, game.stock.cards)
+        self.waste = _talon_hash(WASTE_KEYS, game.waste.cards)
+        self.recycles = _recycle_hash(game)
+        self.history = []
+        self.check = ZOBRIST_DEBUG if check is None else check
+        self.seen = {}
+        if self.check:
+            self._verify(game)
+
+    @property
+    def key(self) -> int:
+        return self.board ^ self.foundation ^ self.stock ^ self.waste ^ self.recycles
+
+    def _set_column(self, col, h):
+        self.board = (self.board - _mix(self.columns[col]) + _mix(h)) & MASK
+        self.columns[col] = h
+
+    def _bump_foundation(self, suit, new_size, delta):
+        i = _SUIT_INDEX[suit]
+        self.foundation ^= FOUNDATION_KEYS[i][new_size - delta] ^ FOUNDATION_KEYS[i][new_size]
+
+    def push(self, game, move, undo):
+        """update the key for a move that do_move has just applied to game"""
+        moved, flipped = undo
+        self.history.append((self.board, self.foundation, self.stock, self.waste, self.recycles, list(self.columns)))
+        m = move
+        if m.move_type == "draw_stock":
+            # the card at talon index i was stock position n - 1 - i and is
+            # now waste position i
+            cards, cursor = game.talon.cards, game.talon.cursor
+            top = len(cards) - 1
+            for i in range(cursor - moved, cursor):
+                code = card_code(cards[i])
+                self.stock ^= STOCK_KEYS[top - i][code]
+                self.waste ^= WASTE_KEYS[i][code]
+        elif m.move_type == "reset_stock":
+            self.stock = _talon_hash(STOCK_KEYS, game.stock.cards)
+            self.waste = 0
+            self.recycles = _recycle_hash(game)
+        elif m.move_type == "waste_to_foundation":
+            suit = SUITS[m.dst]
+            card = game.foundations[suit].peek()
+            self.waste ^= WASTE_KEYS[game.waste.size()][card_code(card)]
+            self._bump_foundation(suit, game.foundations[suit].size(), 1)
+        elif m.move_type == "waste_to_Board":
+            col = m.dst
+            pile = game.Board[col]
+            card = pile.peek()
+            self.waste ^= WASTE_KEYS[game.waste.size()][card_code(card)]
+            self._set_column(col, self.columns[col] ^ _card_key(pile.size() - 1, card, True))
+        elif m.move_type == "Board_to_foundation":
+            if moved:
+                col = m.src
+                suit = SUITS[m.dst]
+                card = game.foundations[suit].peek()
+                h = self.columns[col] ^ _card_key(game.Board[col].size(), card, True)
+                self._set_column(col, self._flip(h, game.Board[col], flipped))
+                self._bump_foundation(suit, game.foundations[suit].size(), 1)
+        elif m.move_type in ("talon_to_foundation", "talon_to_Board"):
+            # the talon is laid out again around the played card
+            self.stock = _talon_hash(STOCK_KEYS, game.stock.cards)
+            self.waste = _talon_hash(WASTE_KEYS, game.waste.cards)
+            self.recycles = _recycle_hash(game)
+            if m.move_type == "talon_to_foundation":
+                suit = SUITS[m.dst]
+                self._bump_foundation(suit, game.foundations[suit].size(), 1)
+            else:
+                pile = game.Board[m.dst]
+                self._set_column(m.dst, self.columns[m.dst] ^ _card_key(pile.size() - 1, pile.peek(), True))
+        elif m.move_type == "Board_to_Board":
+            if moved:
+                src_col, dst_col = m.src, m.dst
+                src, dst = game.Board[src_col], game.Board[dst_col]
+                src_h, dst_h = self.columns[src_col], self.columns[dst_col]
+                first_src, first_dst = src.size(), dst.size() - moved
+                for k in range(moved):
+                    card = dst.cards[first_dst + k]
+                    src_h ^= _card_key(first_src + k, card, True)
+                    dst_h ^= _card_key(first_dst + k, card, True)
+                self._set_column(src_col, self._flip(src_h, src, flipped))
+                self._set_column(dst_col, dst_h)
+        if self.check:
+            self._verify(game)
+
+    def _flip(self, h, pile, flipped):
+        # account for the newly exposed top card of a source column
+        if flipped:
+            pos = pile.size() - 1
+            card = pile.cards[pos]
+            h ^= _card_key(pos, card, False) ^ _card_key(pos, card, True)
+        return h
+
+    def pop(self):
+        """restore the key from before the last push"""
+        self.board, self.foundation, self.stock, self.waste, self.recycles, self.columns = self.history.pop()
+
+    def _verify(self, game):
+        key = self.key
+        assert key == zobrist_key(game), "incremental Zobrist key out of sync"
+        state = serialize_state(game)
+        previous = self.seen.setdefault(key, state)
+        assert previous == state, f"Zobrist collision on key {key:#018x}"
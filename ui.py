@@ -1,4 +1,6 @@
 import sys
+from bisect import bisect_right
+from functools import lru_cache
 import pygame
 from pygame import Rect, Surface
 from typing import Optional, Dict, Any, Tuple, List
@@ -27,6 +29,7 @@ CARD_BORDER_COLOR = (20, 20, 20)
 SLOT_COLOR = (0, 0, 0)
 SELECT_COLOR = (255, 200, 0)
 LABEL_COLOR = (230, 230, 230)
+SPRITE_KEY_COLOR = (255, 0, 255)  # transparent color of cached sprites
 
 # Button constants
 BUTTON_W, BUTTON_H = 160, 40
@@ -111,11 +114,29 @@ def draw_button(surface: Surface, rect: Rect, label: str, font: pygame.font.Font
 
 
 # UI
-def draw_card(surface: Surface, card: Card, x: int, y: int, font: pygame.font.Font):
+# Cards are drawn once into a cached Surface (lazily, on first use) and then
+# blitted, instead of drawing rounded rects and rendering text every frame.
+# Faces are cached per font since the waste and stock use different fonts.
+_card_sprites: Dict[Any, Surface] = {}
+
+
+def _new_sprite(w: int, h: int) -> Surface:
+    # the rounded corners are cut out with a colorkey rather than per-pixel
+    # alpha; colorkeyed (RLE) blits are a lot cheaper
+    sprite = Surface((w, h))
+    if pygame.display.get_surface() is not None:
+        sprite = sprite.convert()
+    sprite.fill(SPRITE_KEY_COLOR)
+    sprite.set_colorkey(SPRITE_KEY_COLOR, pygame.RLEACCEL)
+    return sprite
+
+
+def _paint_card(surface: Surface, card: Card, x: int, y: int, font: pygame.font.Font, face_up: bool = True):
+    # draws a card from scratch; only used to fill the sprite cache
     rect = Rect(x, y, CARD_W, CARD_H)
     pygame.draw.rect(surface, CARD_BORDER_COLOR, rect, border_radius=8)
     inner = rect.inflate(-4, -4)
-    if card.revealed:
+    if face_up:
         pygame.draw.rect(surface, CARD_FACE_COLOR, inner, border_radius=6)
         suit_color = (220, 20, 60) if SUIT_COLORS[card.suit] == "red" else (10, 10, 10)
         rank = RANK_NAMES[card.rank]
@@ -128,21 +149,51 @@ def draw_card(surface: Surface, card: Card, x: int, y: int, font: pygame.font.Fo
         pygame.draw.rect(surface, CARD_BACK_COLOR, inner, border_radius=6)
 
 
+def card_sprite(card: Card, font: pygame.font.Font, face_up: bool = True) -> Surface:
+    key = (card.rank, card.suit, font) if face_up else "back"
+    sprite = _card_sprites.get(key)
+    if sprite is None:
+        sprite = _new_sprite(CARD_W, CARD_H)
+        _paint_card(sprite, card, 0, 0, font, face_up)
+        _card_sprites[key] = sprite
+    return sprite
+
+
+def draw_card(surface: Surface, card: Card, x: int, y: int, font: pygame.font.Font, face_up: bool = True):
+    surface.blit(card_sprite(card, font, face_up), (x, y))
+
+
 # UI
 def draw_slot(surface: Surface, rect: Rect):
-    pygame.draw.rect(surface, SLOT_COLOR, rect, width=2, border_radius=8)
+    sprite = _card_sprites.get(("slot", rect.w, rect.h))
+    if sprite is None:
+        sprite = _new_sprite(rect.w, rect.h)
+        pygame.draw.rect(sprite, SLOT_COLOR, sprite.get_rect(), width=2, border_radius=8)
+        _card_sprites[("slot", rect.w, rect.h)] = sprite
+    surface.blit(sprite, rect.topleft)
+
+
+# UI
+# pile and column labels never change, so they are rendered once as well
+def draw_label(surface: Surface, text: str, pos: Tuple[int, int], font: pygame.font.Font):
+    key = ("label", text, font)
+    img = _card_sprites.get(key)
+    if img is None:
+        img = font.render(text, True, LABEL_COLOR)
+        _card_sprites[key] = img
+    surface.blit(img, pos)
 
 
 # UI
 def draw_pile_label(surface: Surface, rect: Rect, label: str, font_small: pygame.font.Font):
-    draw_text(surface, label, (rect.x, rect.bottom + 6), font_small, LABEL_COLOR)
+    draw_label(surface, label, (rect.x, rect.bottom + 6), font_small)
 
 
 # UI
 def draw_stock(surface: Surface, stock: StockPile, rect: Rect, font_small: pygame.font.Font, selected: Optional[Dict[str, Any]]):
     if stock.size() > 0:
         # draw back of card
-        draw_card(surface, Card(1, "S", revealed=False), rect.x, rect.y, font_small)
+        draw_card(surface, Card(1, "S"), rect.x, rect.y, font_small, face_up=False)
     else:
         draw_slot(surface, rect)
     draw_pile_label(surface, rect, "STOCK", font_small)
@@ -162,58 +213,215 @@ def draw_waste(surface: Surface, waste: WastePile, rect: Rect, font: pygame.font
 
 
 # UI
+def draw_foundation(surface: Surface, pile: FoundationPile, i: int, rect: Rect, font: pygame.font.Font, font_small: pygame.font.Font, selected: Optional[Dict[str, Any]]):
+    if pile.size() > 0:
+        draw_card(surface, pile.peek(), rect.x, rect.y, font)
+    else:
+        draw_slot(surface, rect)
+    draw_pile_label(surface, rect, f"FND {SUIT_SYMBOLS[pile.suit]}", font_small)
+    if selected and selected.get("type") == "foundation" and selected.get("index") == i:
+        pygame.draw.rect(surface, SELECT_COLOR, rect, width=3, border_radius=8)
+
+
 def draw_foundations(surface: Surface, foundations: Dict[str, FoundationPile], rects: List[Rect], font: pygame.font.Font, font_small: pygame.font.Font, selected: Optional[Dict[str, Any]]):
     suits = ["H", "D", "C", "S"]
     for i, suit in enumerate(suits):
-        rect = rects[i]
-        pile = foundations[suit]
-        if pile.size() > 0:
-            draw_card(surface, pile.peek(), rect.x, rect.y, font)
-        else:
-            draw_slot(surface, rect)
-        draw_pile_label(surface, rect, f"FND {SUIT_SYMBOLS[suit]}", font_small)
-        if selected and selected.get("type") == "foundation" and selected.get("index") == i:
-            pygame.draw.rect(surface, SELECT_COLOR, rect, width=3, border_radius=8)
+        draw_foundation(surface, foundations[suit], i, rects[i], font, font_small, selected)
+
+
+# UI
+# Column geometry: the y offset of every card in a column only depends on
+# how many cards it has and how many of them are face down (face-down cards
+# are always at the bottom), so the offsets are computed once per
+# (length, face_down) pair and shared by drawing and hit-testing. A pile
+# that changes simply maps to another key, nothing has to be invalidated.
+@lru_cache(maxsize=None)
+def _column_offsets(length: int, face_down: int) -> Tuple[int, ...]:
+    offsets = []
+    y = 0
+    for i in range(length):
+        offsets.append(y)
+        y += SPREAD_FACEDOWN_Y if i < face_down else SPREAD_FACEUP_Y
+    return tuple(offsets)
+
+
+def column_offsets(pile: BoardPile) -> Tuple[int, ...]:
+    """y offset of each card in the pile, relative to the column's top"""
+    return _column_offsets(len(pile.cards), pile.face_down)
+
+
+def column_height(pile: BoardPile) -> int:
+    offsets = column_offsets(pile)
+    return (offsets[-1] if offsets else 0) + CARD_H
+
+
+def Board_column_at_x(rects: List[Rect], x: int) -> int:
+    # columns are evenly spaced, so the column follows from x directly
+    pitch = rects[1].x - rects[0].x if len(rects) > 1 else CARD_W
+    i = (x - rects[0].x) // pitch
+    if 0 <= i < len(rects) and x < rects[i].right:
+        return i
+    return -1
 
 
 # UI
+def draw_Board_column(surface: Surface, pile: BoardPile, i: int, base: Rect, font: pygame.font.Font, font_small: pygame.font.Font, selected: Optional[Dict[str, Any]]):
+    label_rect = Rect(base.x - 30, base.y, 25, 20)
+    draw_label(surface, f"T{i}", (label_rect.x, label_rect.y), font_small)
+    if pile.size() == 0:
+        draw_slot(surface, base)
+        if selected and selected.get("type") == "Board" and selected.get("index") == i:
+            pygame.draw.rect(surface, SELECT_COLOR, base, width=3, border_radius=8)
+        return
+    offsets = column_offsets(pile)
+    for j, (c, dy) in enumerate(zip(pile.cards, offsets)):
+        draw_card(surface, c, base.x, base.y + dy, font, j >= pile.face_down)
+    if selected and selected.get("type") == "Board" and selected.get("index") == i:
+        bottom_card_rect = Rect(base.x, base.y + offsets[-1], CARD_W, CARD_H)
+        pygame.draw.rect(surface, SELECT_COLOR, bottom_card_rect, width=3, border_radius=8)
+
+
 def draw_Board(surface: Surface, Board: List[BoardPile], rects: List[Rect], font: pygame.font.Font, font_small: pygame.font.Font, selected: Optional[Dict[str, Any]]):
     for i, pile in enumerate(Board):
-        base = rects[i]
-        label_rect = Rect(base.x - 30, base.y, 25, 20)
-        draw_text(surface, f"T{i}", (label_rect.x, label_rect.y), font_small, LABEL_COLOR)
-        if pile.size() == 0:
-            draw_slot(surface, base)
-            if selected and selected.get("type") == "Board" and selected.get("index") == i:
-                pygame.draw.rect(surface, SELECT_COLOR, base, width=3, border_radius=8)
-            continue
-        y = base.y
-        last_card_y = y
-        for c in pile.cards:
-            last_card_y = y
-            draw_card(surface, c, base.x, y, font)
-            y += SPREAD_FACEUP_Y if c.revealed else SPREAD_FACEDOWN_Y
-        if selected and selected.get("type") == "Board" and selected.get("index") == i:
-            bottom_card_rect = Rect(base.x, last_card_y, CARD_W, CARD_H)
-            pygame.draw.rect(surface, SELECT_COLOR, bottom_card_rect, width=3, border_radius=8)
+        draw_Board_column(surface, pile, i, rects[i], font, font_small, selected)
 
 
 # UI
 def _Board_card_index_at_pos(pile: BoardPile, base: Rect, pos: Tuple[int, int]) -> int:
     # Return the index of the clicked card within the pile, or -1 if none.
     x, y = pos
-    cur_y = base.y
-    for i, c in enumerate(pile.cards):
-        # Non-top cards expose only a strip; top card exposes full height
-        h = CARD_H if i == len(pile.cards) - 1 else (SPREAD_FACEUP_Y if c.revealed else SPREAD_FACEDOWN_Y)
-        rect = Rect(base.x, cur_y, CARD_W, max(h, 8))
-        if rect.collidepoint(x, y):
-            return i
-        cur_y += SPREAD_FACEUP_Y if c.revealed else SPREAD_FACEDOWN_Y
-    return -1
-
-
-
-
+    if not base.x <= x < base.right or y < base.y:
+        return -1
+    offsets = column_offsets(pile)
+    if not offsets:
+        return -1
+    # Non-top cards expose only a strip (up to the next card); the top card
+    # exposes its full height
+    i = bisect_right(offsets, y - base.y) - 1
+    if i == len(offsets) - 1 and y - base.y >= offsets[i] + CARD_H:
+        return -1
+    return i
 
 
+# UI
+# Dirty-region rendering: the window is split into regions (stock, waste,
+# each foundation, each column, each button and the message lines). Every
+# frame a cheap signature of what each region shows is computed; only the
+# regions whose signature changed are cleared and redrawn, and only their
+# rects are sent to the display.
+MESSAGE_LINES_Y = (WINDOW_H - MARGIN - MARGIN - 20 - 22, WINDOW_H - MARGIN - 20 - 22)
+MESSAGE_RECT = Rect(MARGIN, MESSAGE_LINES_Y[0], WINDOW_W - 2 * MARGIN, MESSAGE_LINES_Y[1] - MESSAGE_LINES_Y[0] + 26)
+
+
+def _selected_in(selected: Optional[Dict[str, Any]], kind: str, index: int = -1) -> bool:
+    return bool(selected) and selected.get("type") == kind and selected.get("index", -1) == index
+
+
+class DirtyRenderer:
+    def __init__(self, layout: Dict[str, Any], font: pygame.font.Font, font_small: pygame.font.Font):
+        self.layout = layout
+        self.font = font
+        self.font_small = font_small
+        # region rects in drawing order; pile labels sit below the piles, so
+        # the pile rects reach down to the board row
+        label_h = ROW_GAP_Y - 4
+        self.regions: Dict[str, Rect] = {
+            "stock": layout["stock"].inflate(0, label_h).move(0, label_h // 2),
+            "waste": layout["waste"].inflate(0, label_h).move(0, label_h // 2),
+        }
+        for i, rect in enumerate(layout["foundations"]):
+            self.regions[f"foundation{i}"] = rect.inflate(0, label_h).move(0, label_h // 2)
+        for i, base in enumerate(layout["Board"]):
+            # a column's rect follows its length, see _column_rect
+            self.regions[f"Board{i}"] = Rect(base.x - 30, base.y, base.w + 30, CARD_H)
+        for name in ("auto_tree_button", "auto_graph_button", "auto_complete_button", "button"):
+            self.regions[name] = layout[name]
+        self.regions["messages"] = MESSAGE_RECT
+        self.signatures: Dict[str, Any] = {}
+
+    def invalidate(self):
+        """forget what is on screen so the next render redraws everything"""
+        self.signatures = {}
+
+    def _column_rect(self, i: int, pile: BoardPile) -> Rect:
+        base = self.layout["Board"][i]
+        return Rect(base.x - 30, base.y, base.w + 30, column_height(pile))
+
+    @staticmethod
+    def _card_sig(card: Optional[Card]):
+        return (card.rank, card.suit) if card else None
+
+    def _signatures(self, game, selected, buttons, messages) -> Dict[str, Any]:
+        sigs = {
+            "stock": (game.stock.size() > 0, _selected_in(selected, "stock")),
+            "waste": (self._card_sig(game.waste.peek()), _selected_in(selected, "waste")),
+            "messages": tuple(messages),
+        }
+        for i, suit in enumerate(["H", "D", "C", "S"]):
+            sigs[f"foundation{i}"] = (self._card_sig(game.foundations[suit].peek()), _selected_in(selected, "foundation", i))
+        for i, pile in enumerate(game.Board):
+            sigs[f"Board{i}"] = (tuple(self._card_sig(c) for c in pile.cards), pile.face_down, _selected_in(selected, "Board", i))
+        for name, label, hovered in buttons:
+            sigs[name] = (label, hovered)
+        return sigs
+
+    def render(self, surface: Surface, game, selected: Optional[Dict[str, Any]], buttons: List[Tuple[str, str, bool]], messages: List[Optional[str]]) -> List[Rect]:
+        """
+        Redraw the regions that changed since the last call and return the
+        rects to pass to pygame.display.update. buttons are
+        (layout name, label, hovered); messages are the two text lines.
+        """
+        sigs = self._signatures(game, selected, buttons, messages)
+        dirty = {name for name, sig in sigs.items() if self.signatures.get(name) != sig}
+        if not dirty:
+            return []
+        if not self.signatures:
+            surface.fill(BACKGROUND_COLOR)
+        # a changed column has to clear both its old and its new extent
+        clear_rects = dict(self.regions)
+        for i, pile in enumerate(game.Board):
+            name = f"Board{i}"
+            if name in dirty:
+                self.regions[name] = self._column_rect(i, pile)
+                clear_rects[name] = clear_rects[name].union(self.regions[name])
+        # clearing a region wipes whatever overlaps it, so overlapping
+        # regions have to be redrawn too
+        grew = True
+        while grew:
+            grew = False
+            for name, rect in self.regions.items():
+                if name not in dirty and any(rect.colliderect(clear_rects[d]) for d in dirty):
+                    dirty.add(name)
+                    grew = True
+        for name in dirty:
+            surface.fill(BACKGROUND_COLOR, clear_rects[name])
+        # draw in the same order as a full frame so overlaps look the same
+        for name in self.regions:
+            if name in dirty:
+                self._draw_region(surface, name, game, selected, buttons, messages)
+        self.signatures = sigs
+        if len(dirty) == len(self.regions):
+            return [surface.get_rect()]
+        return [clear_rects[name] for name in dirty]
+
+    def _draw_region(self, surface, name, game, selected, buttons, messages):
+        layout = self.layout
+        if name == "stock":
+            draw_stock(surface, game.stock, layout["stock"], self.font_small, selected)
+        elif name == "waste":
+            draw_waste(surface, game.waste, layout["waste"], self.font, self.font_small, selected)
+        elif name.startswith("foundation"):
+            i = int(name[len("foundation"):])
+            suit = ["H", "D", "C", "S"][i]
+            draw_foundation(surface, game.foundations[suit], i, layout["foundations"][i], self.font, self.font_small, selected)
+        elif name.startswith("Board"):
+            i = int(name[len("Board"):])
+            draw_Board_column(surface, game.Board[i], i, layout["Board"][i], self.font, self.font_small, selected)
+        elif name == "messages":
+            for text, y in zip(messages, MESSAGE_LINES_Y):
+                if text:
+                    draw_text(surface, text, (MARGIN, y), self.font_small, (255, 255, 255))
+        else:
+            for button_name, label, hovered in buttons:
+                if button_name == name:
+                    draw_button(surface, layout[name], label, self.font_small, hovered)